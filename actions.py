@@ -1,14 +1,58 @@
 from __future__ import annotations
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
 
 import color
 import exceptions
+from scheduler import NORMAL_COST
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Actor, Entity, Item
 
+class ActionResult(NamedTuple):
+    """
+    The outcome of performing an action.
+
+    Actions may return one of these from `perform` instead of raising
+    `exceptions.Impossible`, which is much cheaper in loops where most attempts fail.
+    Returning None from `perform` still means success.
+
+    success     -- False if the action could not be performed, nothing happened.
+    reason      -- why the action failed, shown to the player.
+    alternative -- another action to perform in place of this one.
+    """
+    success: bool
+    reason: str = ""
+    alternative: Optional[Action] = None
+
+SUCCESS = ActionResult(True)
+BLOCKED = ActionResult(False, "That way is blocked.")
+
+def impossible(reason: str) -> ActionResult:
+    """
+    Return a failed result with the given reason.
+    """
+    return ActionResult(False, reason)
+
+def execute(action: Action) -> ActionResult:
+    """
+    Perform an action, following any alternatives, and return the final result.
+
+    `exceptions.Impossible` raised by actions which haven't been converted to return
+    results is turned into a failed result.
+    """
+    try:
+        result = action.perform()
+        while result is not None and result.alternative is not None:
+            result = result.alternative.perform()
+    except exceptions.Impossible as exc:
+        return ActionResult(False, exc.args[0])
+    return SUCCESS if result is None else result
+
 class Action:
+    # Time this action takes, see `scheduler.TurnScheduler`.
+    cost = NORMAL_COST
+
     def __init__(self, entity: Actor) -> None:
         super().__init__()
         self.entity = entity
@@ -20,10 +64,13 @@ class Action:
         """
         return self.entity.gamemap.engine
 
-    def perform(self) -> None:
+    def perform(self) -> Optional[ActionResult]:
         """
         Perform this action with the object needed to determin its scope.
         This method must be overridden by Action subclasses
+
+        Returns None or an `ActionResult`, failure may also be signalled by raising
+        `exceptions.Impossible`. Use `execute` to handle both.
         """
         raise NotImplementedError()
     
@@ -44,7 +91,7 @@ class PickupAction(Action):
                 if len(inventory.items) >= inventory.capacity:
                     raise exceptions.Impossible("Your inventory is full.")
                 
-                self.engine.game_map.entities.remove(item)
+                self.engine.game_map.remove_entity(item)
                 item.parent = self.entity.inventory
                 inventory.items.append(item)
 
@@ -84,7 +131,196 @@ class DropItem(ItemAction):
 class WaitAction(Action):
     def perform(self) -> None:
         pass
+
+class TakeStairsAction(Action):
+    def perform(self) -> None:
+        """
+        Take the stairs, if any exist at the entity's location.
+        """
+        if (self.entity.x, self.entity.y) == self.engine.game_map.downstairs_location:
+            self.engine.game_world.generate_floor()
+            self.engine.message_log.add_message("You descend the staircase.", color.descend)
+        else:
+            raise exceptions.Impossible("There are no stairs here.")
     
+class MultiTurnAction(Action):
+    """
+    A command which takes several turns, see `Engine.run_multi_turn`.
+    """
+    # The command is refused with this message if any hostile is already in view.
+    hostiles_in_view_message = "You cannot do that with enemies in view."
+
+    def next_action(self) -> Optional[Action]:
+        """
+        Return the action for the next turn, or None once this command is finished.
+
+        May raise `exceptions.Impossible` to stop with a message.
+        """
+        raise NotImplementedError()
+
+    def is_interrupted(self) -> bool:
+        """
+        Called after every turn, return True to stop early.
+        """
+        return False
+
+    def perform(self) -> None:
+        self.engine.run_multi_turn(self)
+
+class AutoExploreAction(MultiTurnAction):
+    """
+    Walk towards the nearest unexplored reachable cell until everything is explored.
+
+    Stops early when a monster comes into view or a new item is seen.
+    """
+    hostiles_in_view_message = "You cannot explore with enemies in view."
+
+    def __init__(self, entity: Actor) -> None:
+        super().__init__(entity)
+        self.seen_items: Set[Item] = set(self._visible_items())
+        self.started = False
+
+    def _visible_items(self) -> Iterator[Item]:
+        game_map = self.engine.game_map
+        return (item for item in game_map.items if game_map.visible[item.x, item.y])
+
+    def next_action(self) -> Optional[Action]:
+        first_turn = not self.started
+        self.started = True
+
+        direction = self.engine.game_map.frontier.step_from(self.entity.x, self.entity.y)
+        if direction is None:
+            if first_turn:
+                raise exceptions.Impossible("There is nothing left to explore.")
+            self.engine.message_log.add_message("Explored everywhere you can reach.")
+            return None
+        return MovementAction(self.entity, *direction)
+
+    def is_interrupted(self) -> bool:
+        for item in self._visible_items():
+            if item not in self.seen_items:
+                self.engine.message_log.add_message(f"You see a {item.name}.")
+                return True
+        return False
+
+class TravelAction(MultiTurnAction):
+    """
+    Walk to a destination along a path planned once over the explored map.
+    """
+    hostiles_in_view_message = "You cannot travel with enemies in view."
+
+    def __init__(self, entity: Actor, destination_x: int, destination_y: int) -> None:
+        super().__init__(entity)
+        self.destination_xy = destination_x, destination_y
+        self.path: Optional[List[Tuple[int, int]]] = None
+
+    def plan(self) -> List[Tuple[int, int]]:
+        """
+        Return the path to the destination through explored walkable tiles.
+        """
+        path = self.engine.player_path_to(*self.destination_xy)
+        if not path and self.destination_xy != (self.entity.x, self.entity.y):
+            raise exceptions.Impossible("You don't know a way there.")
+        return path
+
+    def next_action(self) -> Optional[Action]:
+        if self.path is None:
+            self.path = self.plan()
+        if not self.path:
+            return None
+
+        dest_x, dest_y = self.path.pop(0)
+        return MovementAction(self.entity, dest_x - self.entity.x, dest_y - self.entity.y)
+
+class RestAction(MultiTurnAction):
+    """
+    Wait for a number of turns, or until fully healed if no number is given.
+    """
+    hostiles_in_view_message = "You cannot rest with enemies in view."
+    # Resting until healed gives up after this many turns.
+    max_turns = 1000
+
+    def __init__(self, entity: Actor, turns: Optional[int] = None) -> None:
+        super().__init__(entity)
+        self.turns = turns
+        self.turns_taken = 0
+        # Every turn is the same wait, there's no need for a new action each time.
+        self.wait = WaitAction(entity)
+
+    def next_action(self) -> Optional[Action]:
+        fighter = self.entity.fighter
+        if self.turns is None:
+            if fighter.health >= fighter.max_health:
+                if not self.turns_taken:
+                    raise exceptions.Impossible("You are already at full health.")
+                self.engine.message_log.add_message("You feel rested.")
+                return None
+            if not fighter.regeneration:
+                raise exceptions.Impossible("Resting won't heal you.")
+            if self.turns_taken >= self.max_turns:
+                return None
+        elif self.turns_taken >= self.turns:
+            return None
+
+        self.turns_taken += 1
+        return self.wait
+
+class RunAction(MultiTurnAction):
+    """
+    Move in one direction until something interesting happens.
+
+    Running stops when the way ahead is blocked, on reaching an item, or when the walls
+    to either side change, such as at a corridor junction or a doorway. If `max_steps` is
+    given the move is simply repeated that many times instead, still stopping early if
+    blocked or on an item.
+    """
+    hostiles_in_view_message = "You cannot run with enemies in view."
+
+    def __init__(self, entity: Actor, dx: int, dy: int, max_steps: Optional[int] = None) -> None:
+        super().__init__(entity)
+        self.direction = dx, dy
+        self.max_steps = max_steps
+        self.steps = 0
+        self.sides: Optional[Tuple[bool, bool]] = None
+        self.step = MovementAction(entity, dx, dy)
+
+    def _walkable_sides(self) -> Tuple[bool, bool]:
+        """
+        Return whether the cells to the left and right of the direction of travel are walkable.
+        """
+        game_map = self.engine.game_map
+        dx, dy = self.direction
+        x, y = self.entity.x, self.entity.y
+        return tuple(
+            game_map.in_bounds(x + side_x, y + side_y) and bool(game_map.walkable[x + side_x, y + side_y])
+            for side_x, side_y in ((-dy, dx), (dy, -dx))
+        )
+
+    def next_action(self) -> Optional[Action]:
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            return None
+        if self.steps:
+            game_map = self.engine.game_map
+            x, y = self.entity.x, self.entity.y
+            if any(item.x == x and item.y == y for item in game_map.items):
+                return None
+            if self.max_steps is None:
+                sides = self._walkable_sides()
+                if self.sides is None:
+                    self.sides = sides
+                elif sides != self.sides:
+                    return None
+            dest_x, dest_y = x + self.direction[0], y + self.direction[1]
+            if (
+                not game_map.in_bounds(dest_x, dest_y)
+                or not game_map.walkable[dest_x, dest_y]
+                or (dest_x, dest_y) in game_map.blockers
+            ):
+                return None
+
+        self.steps += 1
+        return self.step
+
 class ActionWithDirection(Action):
     def __init__(self, entity: Actor, delta_x: int, delta_y: int) -> None:
         super().__init__(entity)
@@ -117,49 +353,100 @@ class ActionWithDirection(Action):
         raise NotImplementedError()
     
 class MeleeAction(ActionWithDirection):
-    def perform(self) -> None:
+    def perform(self) -> Optional[ActionResult]:
         target = self.target_actor
         if not target:
-            raise exceptions.Impossible("Nothing to attack.")
-        
-        damage = self.entity.fighter.power - target.fighter.defence
-
-        attack_description = f"{self.entity.name.capitalize()} attacks {target.name}"
-        if self.entity is self.engine.player:
-            attack_color = color.player_attack
-        else:
-            attack_color = color.enemy_attack
-
-        if damage > 0:
-            self.engine.message_log.add_message(
-                f"{attack_description} for {damage} health points.", 
-                attack_color,
-            )
-            target.fighter.health -= damage
-        else:
-            self.engine.message_log.add_message(
-                f"{attack_description} but does no damage", 
-                attack_color,
-            )
+            return impossible("Nothing to attack.")
+        return attack(self.entity, target)
 
 class MovementAction(ActionWithDirection):
-    def perform(self) -> None:
-        destination_x, destination_y = self.destination_xy
-
-        if not self.engine.game_map.in_bounds(destination_x, destination_y):
-            raise exceptions.Impossible("That way is blocked.")
-        
-        if not self.engine.game_map.tiles["walkable"][destination_x, destination_y]:
-            raise exceptions.Impossible("That way is blocked.")
-        
-        if self.engine.game_map.get_blocking_entity_at_location(destination_x, destination_y):
-            raise exceptions.Impossible("That way is blocked.")
-            
-        self.entity.move(self.delta_x, self.delta_y)
+    def perform(self) -> Optional[ActionResult]:
+        return move(self.entity, self.delta_x, self.delta_y)
     
 class BumpAction(ActionWithDirection):
-    def perform(self) -> None:
-        if self.target_actor:
-            return MeleeAction(self.entity, self.delta_x, self.delta_y).perform()
-        else:
-            return MovementAction(self.entity, self.delta_x, self.delta_y).perform()
\ No newline at end of file
+    def perform(self) -> Optional[ActionResult]:
+        return bump(self.entity, self.delta_x, self.delta_y)
+
+# Fast path movement and combat.
+#
+# These resolve a step or an attack for an actor directly, without creating action
+# objects or going through the `engine`, `destination_xy` and `target_actor` properties.
+# A step needs at most one lookup in `GameMap.blockers`. The action classes above and
+# the AI are thin wrappers around these.
+
+# Fighting wakes dormant actors within this many cells.
+MELEE_NOISE_RADIUS = 10
+
+def attack(actor: Actor, target: Actor) -> ActionResult:
+    """
+    Resolve a melee attack from actor against target.
+
+    A target killed earlier in the same turn is no longer there to attack.
+    """
+    if not target.is_alive:
+        return impossible("Nothing to attack.")
+    engine = actor.parent.engine
+    engine.make_noise(target.x, target.y, MELEE_NOISE_RADIUS)
+
+    damage = actor.fighter.power - target.fighter.defence
+
+    attack_description = f"{actor.name.capitalize()} attacks {target.name}"
+    if actor is engine.player:
+        attack_color = color.player_attack
+    else:
+        attack_color = color.enemy_attack
+
+    if damage > 0:
+        engine.message_log.add_message(
+            f"{attack_description} for {damage} health points.", 
+            attack_color,
+        )
+        target.fighter.health -= damage
+    else:
+        engine.message_log.add_message(
+            f"{attack_description} but does no damage", 
+            attack_color,
+        )
+    return SUCCESS
+
+def _step(actor: Actor, x: int, y: int) -> ActionResult:
+    game_map = actor.parent
+    if not game_map.walkable[x, y]:
+        return BLOCKED
+    if not actor.blocks_movement:
+        actor.x = x
+        actor.y = y
+        return SUCCESS
+    blockers = game_map.blockers
+    del blockers[actor.x, actor.y]
+    actor.x = x
+    actor.y = y
+    blockers[x, y] = actor
+    return SUCCESS
+
+def move(actor: Actor, dx: int, dy: int) -> ActionResult:
+    """
+    Move actor by dx, dy if the destination is in bounds, walkable and unoccupied.
+    """
+    game_map = actor.parent
+    x = actor.x + dx
+    y = actor.y + dy
+    if not (0 <= x < game_map.width and 0 <= y < game_map.height) or (x, y) in game_map.blockers:
+        return BLOCKED
+    return _step(actor, x, y)
+
+def bump(actor: Actor, dx: int, dy: int) -> ActionResult:
+    """
+    Attack the live actor at actor's position + dx, dy, or else move there.
+    """
+    game_map = actor.parent
+    x = actor.x + dx
+    y = actor.y + dy
+    if not (0 <= x < game_map.width and 0 <= y < game_map.height):
+        return BLOCKED
+    blocker = game_map.blockers.get((x, y))
+    if blocker is None:
+        return _step(actor, x, y)
+    if getattr(blocker, "is_alive", False):
+        return attack(actor, blocker)
+    return BLOCKED
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Dict, List, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+# Dormant actors are bucketed by chunks of this many cells square, so waking only has to
+# look at the chunks around the player instead of every dormant actor on the map.
+CHUNK_SIZE = 16
+
+class ActivationZones:
+    """
+    Holds the actors which are too far away from the player to be worth running.
+
+    Dormant actors are not in the scheduler, so they cost nothing per turn. They are woken
+    when they come within `radius` of the player (Chebyshev distance), when their cell is
+    visible, or by a noise.
+    """
+    def __init__(self, radius: int = 20, view_radius: int = 8) -> None:
+        self.radius = radius
+        # Actors in view wake even if `radius` is smaller than the FOV radius.
+        self.view_radius = view_radius
+        # Dicts rather than sets, so that actors wake in the order they went to sleep.
+        self.chunks: Dict[Tuple[int, int], Dict[Actor, None]] = {}
+        self.dormant_count = 0
+
+    def is_far(self, actor: Actor, x: int, y: int) -> bool:
+        """
+        Return True if actor is outside the activation radius around x, y.
+        """
+        return max(abs(actor.x - x), abs(actor.y - y)) > self.radius
+
+    def put_to_sleep(self, actor: Actor) -> None:
+        """
+        Make actor dormant.
+        """
+        chunk = (actor.x // CHUNK_SIZE, actor.y // CHUNK_SIZE)
+        self.chunks.setdefault(chunk, {})[actor] = None
+        self.dormant_count += 1
+
+    def _chunks_around(self, x: int, y: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Return the occupied chunks overlapping the square of `radius` around x, y.
+        """
+        min_x, max_x = (x - radius) // CHUNK_SIZE, (x + radius) // CHUNK_SIZE
+        min_y, max_y = (y - radius) // CHUNK_SIZE, (y + radius) // CHUNK_SIZE
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self.chunks):
+            # Cheaper to filter the occupied chunks than to probe the whole square.
+            return [
+                (chunk_x, chunk_y) for chunk_x, chunk_y in self.chunks
+                if min_x <= chunk_x <= max_x and min_y <= chunk_y <= max_y
+            ]
+        return [
+            (chunk_x, chunk_y)
+            for chunk_x in range(min_x, max_x + 1)
+            for chunk_y in range(min_y, max_y + 1)
+            if (chunk_x, chunk_y) in self.chunks
+        ]
+
+    def _wake_where(self, chunks: List[Tuple[int, int]], should_wake) -> List[Actor]:
+        woken = []
+        for chunk in chunks:
+            sleepers = self.chunks[chunk]
+            for actor in [actor for actor in sleepers if should_wake(actor)]:
+                del sleepers[actor]
+                woken.append(actor)
+            if not sleepers:
+                del self.chunks[chunk]
+        self.dormant_count -= len(woken)
+        return woken
+
+    def wake_around(self, x: int, y: int, visible: np.ndarray) -> List[Actor]:
+        """
+        Wake actors within the activation radius of x, y or standing in a visible cell.
+
+        Returns the actors woken.
+        """
+        search_radius = max(self.radius, self.view_radius)
+
+        def should_wake(actor: Actor) -> bool:
+            return not self.is_far(actor, x, y) or bool(visible[actor.x, actor.y])
+
+        return self._wake_where(self._chunks_around(x, y, search_radius), should_wake)
+
+    def wake_noise(self, x: int, y: int, radius: int) -> List[Actor]:
+        """
+        Wake actors within `radius` of a noise at x, y.
+        """
+        def should_wake(actor: Actor) -> bool:
+            return max(abs(actor.x - x), abs(actor.y - y)) <= radius
+
+        return self._wake_where(self._chunks_around(x, y, radius), should_wake)
+
+    def dormant(self) -> Set[Actor]:
+        return {actor for sleepers in self.chunks.values() for actor in sleepers}
@@ -0,0 +1,57 @@
+"""
+Measure enemy turn time as the level population grows, with and without dormancy.
+
+Run from the project root with: python -m benchmarks.activation
+"""
+from __future__ import annotations
+
+import time
+
+import entity_factories
+from engine import Engine
+from procgen import generate_dungeon
+
+# (map_width, map_height, max_rooms, max_monsters_per_room), the same map with more monsters.
+LEVELS = [(400, 240, 600, 1), (400, 240, 600, 4), (400, 240, 600, 16)]
+TURNS = 50
+
+def run(level, activation_radius: int) -> None:
+    map_width, map_height, max_rooms, max_monsters_per_room = level
+    engine = Engine(
+        player=entity_factories.player.clone(),
+        activation_radius=activation_radius,
+        seed=0,
+    )
+    engine.game_map = generate_dungeon(
+        max_rooms=max_rooms,
+        room_min_size=6,
+        room_max_size=10,
+        map_width=map_width,
+        map_height=map_height,
+        max_monsters_per_room=max_monsters_per_room,
+        max_items_per_room=0,
+        engine=engine,
+    )
+    engine.update_fov()
+    population = sum(1 for _ in engine.game_map.actors) - 1
+
+    elapsed = 0.0
+    for _ in range(TURNS):
+        start_time = time.perf_counter()
+        engine.handle_enemy_turns()
+        elapsed += time.perf_counter() - start_time
+        engine.update_fov()
+
+    print(
+        f"{population:>10} {activation_radius:>8} {elapsed * 1000 / TURNS:>10.3f}"
+        f" {engine.scheduler.actions_per_tick:>13} {engine.activation.dormant_count:>8}"
+    )
+
+def main() -> None:
+    print(f"{'population':>10} {'radius':>8} {'ms/turn':>10} {'actions/tick':>13} {'dormant':>8}")
+    for level in LEVELS:
+        run(level, activation_radius=20)
+        run(level, activation_radius=10_000)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure the worst enemy turn with and without an AI time budget, in a room full of orcs
+who can all see the player and so all plan a path every turn.
+
+Run from the project root with: python -m benchmarks.ai_budget
+"""
+from __future__ import annotations
+
+import random
+
+import entity_factories
+import tile_types
+from engine import Engine
+from game_map import GameMap
+
+MAP_SIZE = 200
+MONSTERS = 150
+TURNS = 30
+BUDGETS = [None, 0.020, 0.005]
+
+def crowded_room(ai_budget) -> Engine:
+    """
+    Return an engine with the player in a large open map surrounded by orcs in view.
+    """
+    rng = random.Random(0)
+    engine = Engine(player=entity_factories.player.clone(), ai_budget=ai_budget)
+    game_map = GameMap(engine, MAP_SIZE, MAP_SIZE, entities=[engine.player])
+    game_map.tiles[1:-1, 1:-1] = tile_types.floor
+    centre = MAP_SIZE // 2
+    engine.player.place(centre, centre, game_map)
+    # Keep the orcs from killing the player during the run.
+    engine.player.fighter.max_health = engine.player.fighter.health = 1_000_000
+    while len(list(game_map.actors)) <= MONSTERS:
+        x = centre + rng.randint(-7, 7)
+        y = centre + rng.randint(-7, 7)
+        if not game_map.get_blocking_entity_at_location(x, y):
+            entity_factories.orc.spawn(game_map, x, y)
+    engine.game_map = game_map
+    engine.update_fov()
+    return engine
+
+def main() -> None:
+    print(f"{MONSTERS} orcs in view, {TURNS} turns")
+    print(f"{'budget ms':>10} {'mean ms':>8} {'max ms':>8} {'overruns':>9} {'deferred/turn':>14}")
+    for budget in BUDGETS:
+        engine = crowded_room(budget)
+        seconds = []
+        deferred = 0
+        for _ in range(TURNS):
+            engine.handle_enemy_turns()
+            engine.update_fov()
+            seconds.append(engine.ai_seconds)
+            deferred += engine.ai_deferred
+        label = "none" if budget is None else f"{budget * 1000:.0f}"
+        print(
+            f"{label:>10} {sum(seconds) * 1000 / TURNS:>8.2f} {max(seconds) * 1000:>8.2f}"
+            f" {engine.ai_overruns:>9} {deferred / TURNS:>14.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
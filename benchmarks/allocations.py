@@ -0,0 +1,74 @@
+"""
+Measure how many objects the enemy turn allocates, and the cost of a single bump.
+
+Run from the project root with: python -m benchmarks.allocations
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from actions import Action, BumpAction, bump
+from benchmarks.turn_throughput import crowded_corridor
+
+CORRIDOR_LENGTH = 1_000
+TURNS = 20
+BUMPS = 100_000
+
+def count_actions(engine, turns: int) -> int:
+    """
+    Return how many Action objects are created while running `turns` enemy turns.
+    """
+    created = 0
+    original_init = Action.__init__
+
+    def counting_init(self, *args, **kwargs) -> None:
+        nonlocal created
+        created += 1
+        original_init(self, *args, **kwargs)
+
+    Action.__init__ = counting_init
+    try:
+        for _ in range(turns):
+            engine.handle_enemy_turns()
+    finally:
+        Action.__init__ = original_init
+    return created
+
+def main() -> None:
+    engine = crowded_corridor(CORRIDOR_LENGTH)
+    print(f"{CORRIDOR_LENGTH - 2} monsters in a corridor, {TURNS} turns")
+    created = count_actions(engine, TURNS)
+    print(f"  actions created per turn: {created / TURNS:.1f}")
+
+    engine = crowded_corridor(CORRIDOR_LENGTH)
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    for _ in range(TURNS):
+        engine.handle_enemy_turns()
+    snapshot_after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    new_blocks = sum(
+        stat.count_diff for stat in snapshot_after.compare_to(snapshot_before, "filename")
+        if stat.count_diff > 0
+    )
+    print(f"  live blocks retained per turn: {new_blocks / TURNS:.1f}")
+    print(f"  peak traced memory: {peak / 1024:.0f} KiB")
+
+    engine = crowded_corridor(10)
+    orc = engine.game_map.get_blocking_entity_at_location(3, 1)
+    print("\nCost of a bump into a wall:")
+    start_time = time.perf_counter()
+    for _ in range(BUMPS):
+        BumpAction(orc, 0, -1).perform()
+    elapsed = time.perf_counter() - start_time
+    print(f"  {'BumpAction':<12} {elapsed * 1e9 / BUMPS:>8.0f} ns")
+    start_time = time.perf_counter()
+    for _ in range(BUMPS):
+        bump(orc, 0, -1)
+    elapsed = time.perf_counter() - start_time
+    print(f"  {'bump':<12} {elapsed * 1e9 / BUMPS:>8.0f} ns")
+
+if __name__ == "__main__":
+    main()
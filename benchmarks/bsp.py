@@ -0,0 +1,68 @@
+"""
+Compare the throughput of the BSP generator against placing rooms at random and rejecting
+those which overlap.
+
+Layouts are carved into compact arrays of `tile_types.palette` indices, a 4000x4000 map of
+full tiles would take over 300 MB.
+
+Run from the project root with: python -m benchmarks.bsp
+"""
+from __future__ import annotations
+
+import random
+import time
+
+import numpy as np
+
+import entity_factories
+from engine import Engine
+from procgen import BSP, ROOMS, carve_bsp, carve_random_rooms, generate_dungeon
+import tile_types
+
+# (map_width, map_height, attempts for the random room placer)
+CASES = [(80, 45, 30), (500, 500, 4_000), (4000, 4000, 200_000)]
+ROOM_MIN_SIZE = 6
+ROOM_MAX_SIZE = 10
+
+def main() -> None:
+    print(f"{'map':>11} {'generator':>9} {'rooms':>7} {'floor %':>8} {'ms':>9} {'rooms/s':>10}")
+    for width, height, attempts in CASES:
+        for name in (ROOMS, BSP):
+            tiles = np.full((width, height), fill_value=tile_types.WALL, dtype=np.uint8, order="F")
+            rng = random.Random(0)
+            start_time = time.perf_counter()
+            if name == BSP:
+                rooms = carve_bsp(tiles, ROOM_MIN_SIZE, ROOM_MAX_SIZE, rng, tile_types.FLOOR)
+            else:
+                rooms = carve_random_rooms(
+                    tiles, attempts, ROOM_MIN_SIZE, ROOM_MAX_SIZE, rng, floor=tile_types.FLOOR
+                )
+            elapsed = time.perf_counter() - start_time
+            floor = np.count_nonzero(tiles) / tiles.size * 100
+            print(
+                f"{width:>5}x{height:<5} {name:>9} {len(rooms):>7} {floor:>8.1f}"
+                f" {elapsed * 1000:>9.1f} {len(rooms) / elapsed:>10.0f}"
+            )
+
+    print("\nWhole generate_dungeon, no monsters or items:")
+    print(f"{'map':>11} {'generator':>9} {'rooms':>7} {'ms':>9}")
+    for width, height, attempts in CASES[:2]:
+        for name in (ROOMS, BSP):
+            engine = Engine(player=entity_factories.player.clone(), seed=0)
+            start_time = time.perf_counter()
+            game_map = generate_dungeon(
+                max_rooms=attempts,
+                room_min_size=ROOM_MIN_SIZE,
+                room_max_size=ROOM_MAX_SIZE,
+                map_width=width,
+                map_height=height,
+                max_monsters_per_room=0,
+                max_items_per_room=0,
+                engine=engine,
+                generator=name,
+            )
+            elapsed = time.perf_counter() - start_time
+            print(f"{width:>5}x{height:<5} {name:>9} {len(game_map.rooms):>7} {elapsed * 1000:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure the cellular automaton cave generator, and finding the largest region by linking
+runs against flood filling each region with `tcod.path.dijkstra2d`.
+
+Run from the project root with: python -m benchmarks.caves
+"""
+from __future__ import annotations
+
+import random
+import time
+
+import numpy as np
+import tcod
+
+import entity_factories
+from engine import Engine
+from procgen import CAVES, carve_caves, generate_dungeon, largest_region, wall_counts
+import tile_types
+
+MAP_SIZES = [(80, 45), (500, 500), (2000, 2000), (4000, 4000)]
+# Flood filling is too slow to run on the largest maps.
+FLOOD_FILL_SIZES = MAP_SIZES[:3]
+SECTOR_SIZE = 11
+
+def flood_fill_largest_region(open_cells: np.ndarray) -> np.ndarray:
+    """
+    Return the largest region by flood filling from unvisited cells until what is left
+    can't hold a larger one.
+    """
+    unreached = np.iinfo(np.int32).max
+    cost = open_cells.astype(np.int8)
+    unvisited = open_cells.copy()
+    remaining = int(np.count_nonzero(unvisited))
+    best = np.zeros_like(open_cells)
+    best_size = 0
+    while remaining > best_size:
+        x, y = np.argwhere(unvisited)[0]
+        distance = np.full(open_cells.shape, unreached, dtype=np.int32)
+        distance[x, y] = 0
+        tcod.path.dijkstra2d(distance, cost, 1, 1, out=distance)
+        region = distance != unreached
+        size = int(np.count_nonzero(region))
+        unvisited &= ~region
+        remaining -= size
+        if size > best_size:
+            best, best_size = region, size
+    return best
+
+def main() -> None:
+    print(f"{'map':>11} {'smooth ms':>10} {'region ms':>10} {'flood ms':>9} {'carve ms':>9} {'rooms':>7}")
+    for width, height in MAP_SIZES:
+        walls = np.random.default_rng(0).random((width, height)) < 0.45
+        start_time = time.perf_counter()
+        for _ in range(4):
+            walls = wall_counts(walls) >= 5
+        smooth_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        region = largest_region(~walls)
+        region_time = time.perf_counter() - start_time
+
+        flood = "-"
+        if (width, height) in FLOOD_FILL_SIZES:
+            start_time = time.perf_counter()
+            flooded = flood_fill_largest_region(~walls)
+            flood = f"{(time.perf_counter() - start_time) * 1000:.1f}"
+            assert np.count_nonzero(flooded) == np.count_nonzero(region)
+
+        tiles = np.full((width, height), fill_value=tile_types.WALL, dtype=np.uint8, order="F")
+        start_time = time.perf_counter()
+        rooms = carve_caves(tiles, SECTOR_SIZE, random.Random(0), tile_types.FLOOR)
+        carve_time = time.perf_counter() - start_time
+        print(
+            f"{width:>5}x{height:<5} {smooth_time * 1000:>10.1f} {region_time * 1000:>10.1f}"
+            f" {flood:>9} {carve_time * 1000:>9.1f} {len(rooms):>7}"
+        )
+
+    print("\nWhole generate_dungeon with caves, monsters and items:")
+    for width, height in MAP_SIZES[:2]:
+        engine = Engine(player=entity_factories.player.clone(), seed=0)
+        start_time = time.perf_counter()
+        game_map = generate_dungeon(
+            max_rooms=0,
+            room_min_size=6,
+            room_max_size=SECTOR_SIZE - 1,
+            map_width=width,
+            map_height=height,
+            max_monsters_per_room=2,
+            max_items_per_room=2,
+            engine=engine,
+            generator=CAVES,
+        )
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"{width:>5}x{height:<5} {len(game_map.rooms):>7} rooms"
+            f" {len(game_map.entities):>7} entities {elapsed * 1000:>9.1f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure bulk generation into a dataset file against the number of worker processes, and
+random access to its levels.
+
+Run from the project root with: python -m benchmarks.dataset
+"""
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import time
+
+import entity_factories
+from dataset import LevelDataset, generate_dataset
+from engine import Engine
+from procgen import generate_dungeon
+from world import FloorParameters, generate_floor
+
+LEVELS = 2_000
+READS = 10_000
+
+def main() -> None:
+    parameters = FloorParameters()
+    print("One 80x45 floor at a time:")
+    for name in ("generate_dungeon", "headless"):
+        start_time = time.perf_counter()
+        for seed in range(200):
+            if name == "headless":
+                generate_floor(1, seed, parameters)
+            else:
+                engine = Engine(player=entity_factories.player.clone(), seed=seed)
+                generate_dungeon(**parameters._asdict(), engine=engine)
+        print(f"{name:>17} {200 / (time.perf_counter() - start_time):>8.0f} levels/s")
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    print(f"\n{LEVELS} levels into a dataset, {cores} cores:")
+    print(f"{'workers':>8} {'levels/s':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "levels.dat")
+        base_rate = None
+        for workers in counts:
+            start_time = time.perf_counter()
+            generate_dataset(path, range(LEVELS), parameters, workers=workers)
+            rate = LEVELS / (time.perf_counter() - start_time)
+            base_rate = base_rate or rate
+            print(f"{workers:>8} {rate:>9.0f} {rate / base_rate:>7.1f}x")
+
+        dataset = LevelDataset(path)
+        numbers = [random.randrange(len(dataset)) for _ in range(READS)]
+        start_time = time.perf_counter()
+        for number in numbers:
+            dataset.tiles[number]
+            dataset.level_spawns(number)
+        view_time = (time.perf_counter() - start_time) / READS
+        start_time = time.perf_counter()
+        for number in numbers:
+            dataset.floor(number)
+        floor_time = (time.perf_counter() - start_time) / READS
+        print(
+            f"\nRandom access to {os.path.getsize(path)} bytes: views {view_time * 1e6:.1f} us,"
+            f" whole Floor {floor_time * 1e6:.1f} us per level"
+        )
+
+if __name__ == "__main__":
+    main()
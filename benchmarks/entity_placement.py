@@ -0,0 +1,77 @@
+"""
+Compare placing entities by sampling free cells against drawing random positions and
+scanning every entity on the map for a collision, as `place_entities` used to.
+
+Run from the project root with: python -m benchmarks.entity_placement
+"""
+from __future__ import annotations
+
+import random
+import time
+
+import numpy as np
+
+import entity_factories
+from engine import Engine
+from game_map import GameMap
+from procgen import BSP, RectangularRoom, generate_dungeon, place_entities
+
+# (map_width, map_height, max_monsters_per_room, max_items_per_room)
+CASES = [(80, 45, 2, 2), (200, 200, 4, 4), (500, 500, 4, 4)]
+
+def scan_place_entities(
+    room: RectangularRoom, dungeon: GameMap, maximum_monsters: int, maximum_items: int, rng: random.Random
+) -> None:
+    number_of_monsters = rng.randint(0, maximum_monsters)
+    number_of_items = rng.randint(0, maximum_items)
+    for i in range(number_of_monsters + number_of_items):
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
+        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
+            prototype = entity_factories.orc if i < number_of_monsters else entity_factories.health_potion
+            prototype.spawn(dungeon, x, y)
+
+def empty_map(width: int, height: int) -> GameMap:
+    engine = Engine(player=entity_factories.player.clone(), seed=0)
+    return generate_dungeon(
+        max_rooms=0,
+        room_min_size=6,
+        room_max_size=10,
+        map_width=width,
+        map_height=height,
+        max_monsters_per_room=0,
+        max_items_per_room=0,
+        engine=engine,
+        generator=BSP,
+    )
+
+def main() -> None:
+    print(f"{'map':>9} {'rooms':>6} {'method':>7} {'expected':>8} {'spawned':>8} {'ms':>8}")
+    for width, height, maximum_monsters, maximum_items in CASES:
+        for name in ("scan", "sample"):
+            game_map = empty_map(width, height)
+            rooms = game_map.rooms
+            # The number of entities drawn for each room averages half the maximums.
+            expected = len(rooms) * (maximum_monsters + maximum_items) // 2
+            before = len(game_map.entities)
+            rng = random.Random(0)
+            occupied = np.zeros((width, height), dtype=bool)
+            player = game_map.engine.player
+            occupied[player.x, player.y] = True
+            start_time = time.perf_counter()
+            for room in rooms:
+                if name == "scan":
+                    scan_place_entities(room, game_map, maximum_monsters, maximum_items, rng)
+                else:
+                    place_entities(
+                        room, game_map, maximum_monsters, maximum_items, rng, occupied=occupied
+                    )
+            elapsed = time.perf_counter() - start_time
+            spawned = len(game_map.entities) - before
+            print(
+                f"{width:>4}x{height:<4} {len(rooms):>6} {name:>7} {expected:>8} {spawned:>8}"
+                f" {elapsed * 1000:>8.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measure how long descending to a new floor keeps the player waiting, generating the floor
+on the spot against installing one a worker process generated ahead of time.
+
+Run from the project root with: python -m benchmarks.floors
+"""
+from __future__ import annotations
+
+import time
+
+import entity_factories
+from engine import Engine
+import tile_types
+from world import FloorParameters, GameWorld
+
+# (name, parameters), the default floor and a large one.
+LEVELS = [
+    ("80x45", FloorParameters()),
+    ("400x240", FloorParameters(max_rooms=600, map_width=400, map_height=240)),
+]
+DESCENTS = 5
+# Time the player spends on each floor, giving the worker time to finish the next one.
+EXPLORE_SECONDS = 2.0
+
+def descend(parameters: FloorParameters, background: bool) -> float:
+    """
+    Return the average seconds taken by each descent after the first.
+    """
+    engine = Engine(player=entity_factories.player.clone(), seed=0)
+    world = engine.game_world = GameWorld(
+        engine, parameters=lambda depth: parameters, background=background
+    )
+    world.generate_floor()
+    elapsed = 0.0
+    for _ in range(DESCENTS):
+        if background:
+            time.sleep(EXPLORE_SECONDS)
+        start_time = time.perf_counter()
+        world.generate_floor()
+        elapsed += time.perf_counter() - start_time
+    world.close()
+    return elapsed / DESCENTS
+
+def main() -> None:
+    print(f"{'map':>8} {'generate ms':>12} {'prefetched ms':>14} {'tiles bytes':>12} {'compact bytes':>14}")
+    for name, parameters in LEVELS:
+        on_the_spot = descend(parameters, background=False)
+        prefetched = descend(parameters, background=True)
+        engine = Engine(player=entity_factories.player.clone(), seed=0)
+        world = engine.game_world = GameWorld(
+            engine, parameters=lambda depth: parameters, background=False
+        )
+        floor = world.take(1)
+        full_size = parameters.map_width * parameters.map_height * tile_types.tile_dt.itemsize
+        print(
+            f"{name:>8} {on_the_spot * 1000:>12.1f} {prefetched * 1000:>14.1f}"
+            f" {full_size:>12} {floor.nbytes:>14}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure the ALT landmark heuristic against a plain octile heuristic for A*.
+
+Run from the project root with: python -m benchmarks.landmarks
+"""
+from __future__ import annotations
+
+import random
+import time
+
+import numpy as np
+
+from benchmarks.pathfinding import new_map, random_queries, tcod_path
+from pathfinding import Landmarks, astar, octile_distance
+
+# (map_width, map_height, max_rooms)
+MAP_SIZES = [(80, 45, 30), (200, 120, 150), (400, 240, 600)]
+LANDMARK_COUNTS = [4, 8, 16]
+QUERIES = 30
+
+def main() -> None:
+    random.seed(0)
+    for map_width, map_height, max_rooms in MAP_SIZES:
+        game_map = new_map(map_width, map_height, max_rooms)
+        cost = np.array(game_map.tiles["walkable"], dtype=np.int8)
+        queries = random_queries(game_map, QUERIES)
+        print(f"Map {map_width}x{map_height}")
+
+        start_time = time.perf_counter()
+        reached = 0
+        path_length = 0
+        for start, goal in queries:
+            length, nodes = tcod_path(game_map.tiles["walkable"], start, goal)
+            path_length += length
+            reached += nodes
+        elapsed = time.perf_counter() - start_time
+        print(f"  average path length {path_length / QUERIES:.0f}")
+        print(
+            f"  tcod      reached/query  {reached / QUERIES:>8.0f}"
+            f"  ms/query {elapsed * 1000 / QUERIES:>8.3f}"
+        )
+
+        start_time = time.perf_counter()
+        expanded = 0
+        for start, goal in queries:
+            goal_x, goal_y = goal
+            heuristic = lambda x, y: octile_distance(goal_x - x, goal_y - y)
+            expanded += astar(cost, start, goal, heuristic)[1]
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"  octile    expanded/query {expanded / QUERIES:>8.0f}"
+            f"  ms/query {elapsed * 1000 / QUERIES:>8.3f}"
+        )
+
+        for count in LANDMARK_COUNTS:
+            landmarks = Landmarks(game_map.tiles["walkable"], count)
+            start_time = time.perf_counter()
+            expanded = 0
+            for start, goal in queries:
+                landmarks.path_to(start, goal)
+                expanded += landmarks.nodes_expanded
+            elapsed = time.perf_counter() - start_time
+            print(
+                f"  alt k={count:<3} expanded/query {expanded / QUERIES:>8.0f}"
+                f"  ms/query {elapsed * 1000 / QUERIES:>8.3f}"
+                f"  preprocess {landmarks.preprocess_seconds * 1000:>8.1f} ms"
+                f"  memory {landmarks.nbytes / 1024:>8.1f} KiB"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compare generating floors against loading them from `map_cache.MapCache`, and show the
+cache's eviction once it is over its size limit.
+
+Run from the project root with: python -m benchmarks.map_cache
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+
+from map_cache import MapCache, dump_floor
+from procgen import BSP
+from world import FloorParameters, generate_floor
+
+# (name, parameters)
+LEVELS = [
+    ("80x45", FloorParameters()),
+    ("500x500", FloorParameters(map_width=500, map_height=500, generator=BSP)),
+]
+SEEDS = 20
+
+def main() -> None:
+    print(f"{'map':>8} {'generate ms':>12} {'load ms':>8} {'file bytes':>11}")
+    for name, parameters in LEVELS:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = MapCache(directory)
+            start_time = time.perf_counter()
+            for seed in range(SEEDS):
+                cache.load_or_generate(1, seed, parameters)
+            generate_time = (time.perf_counter() - start_time) / SEEDS
+            start_time = time.perf_counter()
+            for seed in range(SEEDS):
+                cache.load_or_generate(1, seed, parameters)
+            load_time = (time.perf_counter() - start_time) / SEEDS
+            size = cache.total_bytes // SEEDS
+            print(f"{name:>8} {generate_time * 1000:>12.1f} {load_time * 1000:>8.2f} {size:>11}")
+            print(f"{'':>8} hits {cache.hits}, misses {cache.misses}, hit rate {cache.hit_rate:.0%}")
+
+    print("\nEviction with room for 5 floors, seeds 0 to 7 then the last 4 again:")
+    parameters = FloorParameters()
+    size = len(dump_floor(generate_floor(1, 0, parameters)))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = MapCache(directory, max_bytes=size * 5 + size // 2)
+        for seed in list(range(8)) + list(range(4, 8)):
+            cache.load_or_generate(1, seed, parameters)
+        print(
+            f"  hits {cache.hits}, misses {cache.misses}, evictions {cache.evictions},"
+            f" {len(cache.entries)} floors, {cache.total_bytes} of {cache.max_bytes} bytes"
+        )
+
+if __name__ == "__main__":
+    main()
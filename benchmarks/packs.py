@@ -0,0 +1,84 @@
+"""
+Compare path searches per turn for monsters chasing independently and in packs, and for
+packs once the AI budget runs out.
+
+Run from the project root with: python -m benchmarks.packs
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Optional
+
+import entity_factories
+import tile_types
+from components.ai import BaseAI, Pack
+from engine import Engine
+from game_map import GameMap
+
+MAP_SIZE = 120
+PACKS = 20
+PACK_SIZE = 5
+TURNS = 30
+# (packs, AI budget in seconds)
+CASES = [(False, None), (True, None), (True, 0.002)]
+
+def open_map(packs: bool, ai_budget: Optional[float] = None) -> Engine:
+    """
+    Return an engine with the player in an open map surrounded by groups of orcs in view.
+    """
+    rng = random.Random(0)
+    engine = Engine(player=entity_factories.player.clone(), ai_budget=ai_budget)
+    game_map = GameMap(engine, MAP_SIZE, MAP_SIZE, entities=[engine.player])
+    game_map.tiles[1:-1, 1:-1] = tile_types.floor
+    centre = MAP_SIZE // 2
+    engine.player.place(centre, centre, game_map)
+    # Keep the orcs from killing the player during the run.
+    engine.player.fighter.max_health = engine.player.fighter.health = 1_000_000
+    # Each group gets a 3x3 block in a grid around the player.
+    blocks = [(bx, by) for bx in range(-2, 3) for by in range(-2, 3) if bx or by]
+    for block_x, block_y in rng.sample(blocks, PACKS):
+        cells = [
+            (centre + block_x * 3 + dx, centre + block_y * 3 + dy)
+            for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+        ]
+        group = [
+            entity_factories.orc.spawn(game_map, x, y) for x, y in rng.sample(cells, PACK_SIZE)
+        ]
+        if packs:
+            Pack(group)
+    engine.game_map = game_map
+    engine.update_fov()
+    return engine
+
+def main() -> None:
+    searches = 0
+    original_get_path_to = BaseAI.get_path_to
+
+    def counting_get_path_to(self, *args):
+        nonlocal searches
+        searches += 1
+        return original_get_path_to(self, *args)
+
+    BaseAI.get_path_to = counting_get_path_to
+    print(f"{PACKS} groups of {PACK_SIZE} orcs, {TURNS} turns")
+    print(f"{'':>12} {'budget ms':>10} {'ms/turn':>8} {'searches/turn':>14}")
+    try:
+        for packs, budget in CASES:
+            engine = open_map(packs, budget)
+            searches = 0
+            start_time = time.perf_counter()
+            for _ in range(TURNS):
+                engine.handle_enemy_turns()
+            elapsed = time.perf_counter() - start_time
+            label = "packs" if packs else "independent"
+            budget_label = "none" if budget is None else f"{budget * 1000:.0f}"
+            print(
+                f"{label:>12} {budget_label:>10} {elapsed * 1000 / TURNS:>8.2f}"
+                f" {searches / TURNS:>14.1f}"
+            )
+    finally:
+        BaseAI.get_path_to = original_get_path_to
+
+if __name__ == "__main__":
+    main()
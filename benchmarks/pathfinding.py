@@ -0,0 +1,88 @@
+"""
+Compare the jump point search pathfinder with the tcod pathfinder used by `BaseAI`.
+
+Run from the project root with: python -m benchmarks.pathfinding
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+import tcod
+
+import entity_factories
+from engine import Engine
+from game_map import GameMap
+from pathfinding import JumpPointSearch
+from procgen import generate_dungeon
+
+# (map_width, map_height, max_rooms)
+MAP_SIZES = [(80, 45, 30), (200, 120, 150), (400, 240, 600)]
+QUERIES = 50
+
+def new_map(map_width: int, map_height: int, max_rooms: int) -> GameMap:
+    engine = Engine(player=entity_factories.player.clone(), seed=0)
+    return generate_dungeon(
+        max_rooms=max_rooms,
+        room_min_size=6,
+        room_max_size=10,
+        map_width=map_width,
+        map_height=map_height,
+        max_monsters_per_room=0,
+        max_items_per_room=0,
+        engine=engine,
+    )
+
+def random_queries(game_map: GameMap, count: int) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    floor = np.argwhere(game_map.tiles["walkable"])
+    queries = []
+    for _ in range(count):
+        start, goal = random.sample(range(len(floor)), 2)
+        queries.append((tuple(floor[start]), tuple(floor[goal])))
+    return queries
+
+def tcod_path(walkable: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Return the path length and the number of nodes reached, the same way as `BaseAI.get_path_to`.
+    """
+    cost = np.array(walkable, dtype=np.int8)
+    graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
+    pathfinder = tcod.path.Pathfinder(graph)
+    pathfinder.add_root(start)
+    path = pathfinder.path_to(goal)[1:]
+    reached = int(np.count_nonzero(pathfinder.distance != np.iinfo(pathfinder.distance.dtype).max))
+    return len(path), reached
+
+def main() -> None:
+    random.seed(0)
+    print(f"{'map':>10} {'pathfinder':>10} {'expanded/query':>15} {'ms/query':>10}")
+    for map_width, map_height, max_rooms in MAP_SIZES:
+        game_map = new_map(map_width, map_height, max_rooms)
+        walkable = game_map.tiles["walkable"]
+        queries = random_queries(game_map, QUERIES)
+
+        start_time = time.perf_counter()
+        tcod_reached = 0
+        for start, goal in queries:
+            tcod_reached += tcod_path(walkable, start, goal)[1]
+        tcod_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        jps = JumpPointSearch(walkable)
+        build_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        jps_expanded = 0
+        for start, goal in queries:
+            jps.path_to(start, goal)
+            jps_expanded += jps.nodes_expanded
+        jps_time = time.perf_counter() - start_time
+
+        size = f"{map_width}x{map_height}"
+        print(f"{size:>10} {'tcod':>10} {tcod_reached / QUERIES:>15.0f} {tcod_time * 1000 / QUERIES:>10.3f}")
+        print(f"{size:>10} {'jps':>10} {jps_expanded / QUERIES:>15.0f} {jps_time * 1000 / QUERIES:>10.3f}")
+        print(f"{'':>10} (jps grid built once per map in {build_time * 1000:.3f} ms)")
+
+if __name__ == "__main__":
+    main()
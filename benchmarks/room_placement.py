@@ -0,0 +1,94 @@
+"""
+Compare placing rooms with the summed-area table in `procgen.RoomPlacer` against testing
+every accepted room with `RectangularRoom.intersects`, as `generate_dungeon` used to.
+
+Run from the project root with: python -m benchmarks.room_placement
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import List
+
+import entity_factories
+from engine import Engine
+from procgen import RectangularRoom, RoomPlacer, generate_dungeon
+
+# (map width, map height, attempts)
+CASES = [(80, 45, 30), (500, 500, 5_000), (2_000, 2_000, 50_000)]
+ROOM_MIN_SIZE = 6
+ROOM_MAX_SIZE = 10
+# The pairwise test is quadratic, skip it when it would take too long.
+LEGACY_MAX_ATTEMPTS = 5_000
+# (map width, map height, attempts without fit_rooms, attempts with fit_rooms), the last
+# packs the map close to full.
+GENERATE_CASES = [(80, 45, 30, 3), (500, 500, 5_000, 500), (500, 500, 100_000, 2_500)]
+
+def candidates(width: int, height: int, attempts: int) -> List[RectangularRoom]:
+    rng = random.Random(0)
+    rooms = []
+    for _ in range(attempts):
+        room_width = rng.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+        room_height = rng.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+        x = rng.randint(0, width - room_width - 1)
+        y = rng.randint(0, height - room_height - 1)
+        rooms.append(RectangularRoom(x, y, room_width, room_height))
+    return rooms
+
+def place_legacy(width: int, height: int, candidates: List[RectangularRoom]) -> int:
+    rooms: List[RectangularRoom] = []
+    for new_room in candidates:
+        if any(new_room.intersects(other_room) for other_room in rooms):
+            continue
+        rooms.append(new_room)
+    return len(rooms)
+
+def place_table(width: int, height: int, candidates: List[RectangularRoom]) -> int:
+    placer = RoomPlacer(width, height)
+    placed = 0
+    for new_room in candidates:
+        if placer.is_free(new_room):
+            placer.add(new_room)
+            placed += 1
+    return placed
+
+def main() -> None:
+    print("Room placement only:")
+    print(f"{'map':>11} {'attempts':>9} {'method':>8} {'rooms':>6} {'ms':>9}")
+    for width, height, attempts in CASES:
+        rooms = candidates(width, height, attempts)
+        for name, place in (("legacy", place_legacy), ("table", place_table)):
+            if place is place_legacy and attempts > LEGACY_MAX_ATTEMPTS:
+                continue
+            start_time = time.perf_counter()
+            placed = place(width, height, rooms)
+            elapsed = time.perf_counter() - start_time
+            print(f"{width:>5}x{height:<5} {attempts:>9} {name:>8} {placed:>6} {elapsed * 1000:>9.1f}")
+
+    print("\nWhole generate_dungeon, no monsters or items:")
+    print(f"{'map':>11} {'attempts':>9} {'fit_rooms':>9} {'rooms':>6} {'ms':>9}")
+    for width, height, attempts, fit_attempts in GENERATE_CASES:
+        for fit_rooms in (False, True):
+            # Fitting every attempt is slower per attempt but few of them fail.
+            max_rooms = fit_attempts if fit_rooms else attempts
+            engine = Engine(player=entity_factories.player.clone(), seed=0)
+            start_time = time.perf_counter()
+            game_map = generate_dungeon(
+                max_rooms=max_rooms,
+                room_min_size=ROOM_MIN_SIZE,
+                room_max_size=ROOM_MAX_SIZE,
+                map_width=width,
+                map_height=height,
+                max_monsters_per_room=0,
+                max_items_per_room=0,
+                engine=engine,
+                fit_rooms=fit_rooms,
+            )
+            elapsed = time.perf_counter() - start_time
+            print(
+                f"{width:>5}x{height:<5} {max_rooms:>9} {str(fit_rooms):>9}"
+                f" {len(game_map.rooms):>6} {elapsed * 1000:>9.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
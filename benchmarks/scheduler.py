@@ -0,0 +1,53 @@
+"""
+Measure the cost of a tick of `TurnScheduler` as the number of scheduled actors grows.
+
+Run from the project root with: python -m benchmarks.scheduler
+"""
+from __future__ import annotations
+
+import random
+import time
+
+from scheduler import NORMAL_COST, NORMAL_SPEED, TurnScheduler
+
+ACTOR_COUNTS = [1_000, 10_000, 50_000]
+TICKS = 200
+
+class DummyActor:
+    is_alive = True
+
+    def __init__(self, speed: int) -> None:
+        self.speed = speed
+
+def main() -> None:
+    random.seed(0)
+    print(f"{'actors':>8} {'us/tick':>10} {'actions/tick':>13} {'queue depth':>12}")
+    for count in ACTOR_COUNTS:
+        scheduler = TurnScheduler()
+        for _ in range(count):
+            # Mostly slow sleepers with a few normal speed actors, spread over time.
+            speed = random.choice([NORMAL_SPEED // 10] * 9 + [NORMAL_SPEED])
+            scheduler.schedule(DummyActor(speed), random.randrange(NORMAL_COST * 10))
+
+        actions = 0
+        start_time = time.perf_counter()
+        for _ in range(TICKS):
+            until = scheduler.time + NORMAL_COST
+            scheduler.begin_tick()
+            while True:
+                due = scheduler.pop_due(until)
+                if not due:
+                    break
+                for acted_at, actor in due:
+                    scheduler.schedule_at(actor, acted_at + scheduler.delay(actor, NORMAL_COST))
+            scheduler.end_tick(until)
+            actions += scheduler.actions_per_tick
+        elapsed = time.perf_counter() - start_time
+
+        print(
+            f"{count:>8} {elapsed * 1e6 / TICKS:>10.1f} {actions / TICKS:>13.1f}"
+            f" {scheduler.queue_depth:>12}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare moving monsters one after another with resolving their moves simultaneously, for a
+block of orcs marching in step. The orcs act back to front, so one at a time most of them
+walk into the back of the orc ahead.
+
+Run from the project root with: python -m benchmarks.simultaneous_moves
+"""
+from __future__ import annotations
+
+import time
+
+import entity_factories
+import tile_types
+from engine import Engine
+from game_map import GameMap
+
+BLOCK_SIZES = [10, 30, 70]
+TURNS = 20
+
+def marching_block(size: int, simultaneous_moves: bool) -> Engine:
+    """
+    Return an engine with a square block of orcs, each with a path straight to the right.
+    """
+    width = size + TURNS + 2
+    engine = Engine(
+        player=entity_factories.player.clone(),
+        activation_radius=width * 2,
+        simultaneous_moves=simultaneous_moves,
+    )
+    game_map = GameMap(engine, width, size + 2, entities=[engine.player])
+    game_map.tiles[1:-1, 1:-1] = tile_types.floor
+    # The player is out of the way in the corner, and can't see the orcs.
+    engine.player.place(0, 0, game_map)
+    for x in range(1, size + 1):
+        for y in range(1, size + 1):
+            orc = entity_factories.orc.spawn(game_map, x, y)
+            orc.ai.path = [(x + step, y) for step in range(1, TURNS + 1)]
+    engine.game_map = game_map
+    return engine
+
+def main() -> None:
+    print(f"{TURNS} turns")
+    print(f"{'orcs':>6} {'mode':>13} {'ms/turn':>8} {'us/orc':>7} {'steps taken':>12} {'us/step':>8}")
+    for size in BLOCK_SIZES:
+        for simultaneous_moves in (False, True):
+            engine = marching_block(size, simultaneous_moves)
+            orcs = [actor for actor in engine.game_map.actors if actor is not engine.player]
+            start_x = sum(orc.x for orc in orcs)
+            start_time = time.perf_counter()
+            for _ in range(TURNS):
+                engine.handle_enemy_turns()
+            elapsed = time.perf_counter() - start_time
+            steps = sum(orc.x for orc in orcs) - start_x
+            mode = "simultaneous" if simultaneous_moves else "sequential"
+            print(
+                f"{len(orcs):>6} {mode:>13} {elapsed * 1000 / TURNS:>8.2f}"
+                f" {elapsed * 1e6 / TURNS / len(orcs):>7.2f} {steps:>12}"
+                f" {elapsed * 1e6 / steps:>8.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
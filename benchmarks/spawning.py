@@ -0,0 +1,46 @@
+"""
+Compare spawning entities from their prototypes with `Entity.clone` against `copy.deepcopy`.
+
+Run from the project root with: python -m benchmarks.spawning
+"""
+from __future__ import annotations
+
+import copy
+import time
+
+import entity_factories
+from engine import Engine
+from game_map import GameMap
+
+SPAWNS = 20_000
+
+def deepcopy_spawn(prototype, gamemap: GameMap, x: int, y: int):
+    """
+    Spawn the way `Entity.spawn` used to.
+    """
+    clone = copy.deepcopy(prototype)
+    clone.x = x
+    clone.y = y
+    clone.parent = gamemap
+    gamemap.add_entity(clone)
+    return clone
+
+def main() -> None:
+    print(f"{'prototype':>18} {'deepcopy/s':>11} {'clone/s':>11} {'speedup':>8}")
+    for name, prototype in entity_factories.spawnable.items():
+        rates = []
+        for spawn in (deepcopy_spawn, type(prototype).spawn):
+            engine = Engine(player=entity_factories.player.clone())
+            gamemap = GameMap(engine, SPAWNS, 1)
+            start_time = time.perf_counter()
+            for x in range(SPAWNS):
+                spawn(prototype, gamemap, x, 0)
+            rates.append(SPAWNS / (time.perf_counter() - start_time))
+        deepcopy_rate, clone_rate = rates
+        print(
+            f"{name:>18} {deepcopy_rate:>11.0f} {clone_rate:>11.0f}"
+            f" {clone_rate / deepcopy_rate:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measure the per-turn cost of tracking many status effects on the timer wheel, against
+counting every effect down each turn as the old confusion AI wrapper did.
+
+Run from the project root with: python -m benchmarks.status_effects
+"""
+from __future__ import annotations
+
+import random
+import time
+
+from status_effects import EffectType, StatusEffects
+
+EFFECT_COUNTS = [1_000, 10_000, 100_000]
+TURNS = 500
+POISONED = EffectType("poisoned")
+
+class Target:
+    """
+    Stands in for an actor, only `effects` is used.
+    """
+    def __init__(self) -> None:
+        self.effects = {}
+
+class CountdownEffect:
+    def __init__(self, turns_remaining: int) -> None:
+        self.turns_remaining = turns_remaining
+
+    def tick(self) -> bool:
+        self.turns_remaining -= 1
+        return self.turns_remaining <= 0
+
+def main() -> None:
+    print(f"{'effects':>8} {'wheel us/turn':>14} {'countdown us/turn':>18}")
+    for count in EFFECT_COUNTS:
+        rng = random.Random(0)
+        durations = [rng.randint(1, 2_000) for _ in range(count)]
+
+        manager = StatusEffects()
+        for duration in durations:
+            manager.apply(Target(), POISONED, duration, 0)
+        start_time = time.perf_counter()
+        for turn in range(1, TURNS + 1):
+            manager.advance(turn)
+        wheel_time = time.perf_counter() - start_time
+
+        effects = [CountdownEffect(duration) for duration in durations]
+        start_time = time.perf_counter()
+        for _ in range(TURNS):
+            effects = [effect for effect in effects if not effect.tick()]
+        countdown_time = time.perf_counter() - start_time
+
+        print(
+            f"{count:>8} {wheel_time * 1e6 / TURNS:>14.1f} {countdown_time * 1e6 / TURNS:>18.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare carving corridors one cell at a time with `tunnel_between` against the slice
+assignments of `carve_tunnel`.
+
+Run from the project root with: python -m benchmarks.tunnels
+"""
+from __future__ import annotations
+
+import random
+import time
+from typing import Iterator, Tuple
+
+import numpy as np
+import tcod
+
+import tile_types
+from procgen import carve_tunnel
+
+MAP_SIZE = 500
+TUNNELS = 2_000
+
+def tunnel_between(
+    start: Tuple[int, int], end: Tuple[int, int], rng: random.Random
+) -> Iterator[Tuple[int, int]]:
+    """
+    Return an L-shaped tunnel between these two points, the cell by cell version which
+    `carve_tunnel` replaced.
+    """
+    x1, y1 = start
+    x2, y2 = end
+    if rng.random() < 0.5: # 50% chance.
+        corner_x, corner_y = x2, y1 # Move horizontally, then vertically.
+    else:
+        corner_x, corner_y = x1, y2 # Move vertically, then horizontally.
+
+    for x, y in tcod.los.bresenham((x1, y1), (corner_x, corner_y)).tolist():
+        yield x, y
+
+    for x, y in tcod.los.bresenham((corner_x, corner_y), (x2, y2)).tolist():
+        yield x, y
+
+def main() -> None:
+    rng = random.Random(0)
+    def random_cell():
+        return rng.randrange(MAP_SIZE), rng.randrange(MAP_SIZE)
+
+    ends = [(random_cell(), random_cell()) for _ in range(TUNNELS)]
+
+    per_cell = np.full((MAP_SIZE, MAP_SIZE), fill_value=tile_types.wall, order="F")
+    tunnel_rng = random.Random(0)
+    start_time = time.perf_counter()
+    for start, end in ends:
+        for x, y in tunnel_between(start, end, tunnel_rng):
+            per_cell[x, y] = tile_types.floor
+    per_cell_time = time.perf_counter() - start_time
+
+    sliced = np.full((MAP_SIZE, MAP_SIZE), fill_value=tile_types.wall, order="F")
+    tunnel_rng = random.Random(0)
+    start_time = time.perf_counter()
+    for start, end in ends:
+        carve_tunnel(sliced, start, end, tunnel_rng)
+    sliced_time = time.perf_counter() - start_time
+
+    assert (per_cell == sliced).all()
+    print(f"{TUNNELS} tunnels on a {MAP_SIZE}x{MAP_SIZE} map")
+    print(f"  tunnel_between  {per_cell_time * 1e6 / TUNNELS:>8.1f} us/tunnel")
+    print(f"  carve_tunnel    {sliced_time * 1e6 / TUNNELS:>8.1f} us/tunnel")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure turn throughput when a corridor is packed with monsters, so most moves fail.
+
+Run from the project root with: python -m benchmarks.turn_throughput
+"""
+from __future__ import annotations
+
+import time
+
+import entity_factories
+import exceptions
+import tile_types
+from actions import MovementAction
+from engine import Engine
+from game_map import GameMap
+
+CORRIDOR_LENGTHS = [100, 1_000, 5_000]
+TURNS = 50
+FAILED_MOVES = 100_000
+
+class RaisingMovementAction(MovementAction):
+    """
+    A movement action signalling failure the old way, by raising Impossible.
+    """
+    def perform(self) -> None:
+        result = super().perform()
+        if not result.success:
+            raise exceptions.Impossible(result.reason)
+
+def crowded_corridor(length: int) -> Engine:
+    """
+    Return an engine with the player at the end of a corridor full of orcs walking towards it.
+    """
+    engine = Engine(player=entity_factories.player.clone(), activation_radius=length)
+    game_map = GameMap(engine, length + 2, 3, entities=[engine.player])
+    game_map.tiles[1:-1, 1] = tile_types.floor
+    engine.player.place(1, 1, game_map)
+    for x in range(3, length + 1):
+        orc = entity_factories.orc.spawn(game_map, x, 1)
+        # A long path towards the player, most steps are blocked by the orc in front.
+        orc.ai.path = [(x - 1, 1)] * TURNS
+    engine.game_map = game_map
+    return engine
+
+def main() -> None:
+    print(f"{'monsters':>9} {'ms/turn':>10} {'actions/s':>12}")
+    for length in CORRIDOR_LENGTHS:
+        engine = crowded_corridor(length)
+        actions = 0
+        start_time = time.perf_counter()
+        for _ in range(TURNS):
+            engine.handle_enemy_turns()
+            actions += engine.scheduler.actions_per_tick
+        elapsed = time.perf_counter() - start_time
+        print(f"{length - 2:>9} {elapsed * 1000 / TURNS:>10.3f} {actions / elapsed:>12.0f}")
+
+    engine = crowded_corridor(10)
+    orc = engine.game_map.get_blocking_entity_at_location(3, 1)
+    print("\nCost of a move into a wall:")
+    for action_class in (MovementAction, RaisingMovementAction):
+        action = action_class(orc, 0, -1)
+        start_time = time.perf_counter()
+        for _ in range(FAILED_MOVES):
+            try:
+                action.perform()
+            except exceptions.Impossible:
+                pass
+        elapsed = time.perf_counter() - start_time
+        print(f"  {action_class.__name__:<22} {elapsed * 1e9 / FAILED_MOVES:>8.0f} ns")
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,9 @@ error = (0xFF, 0x40, 0x40)
 
 welcome_text = (0x20, 0xA0, 0xFF)
 health_recovered = (0x00, 0xFF, 0x00)
+descend = (0x9F, 0x3F, 0xFF)
+
+hover_path = (0x30, 0x30, 0x60)
 
 bar_text = white
 bar_filled = (0x00, 0x60, 0x00)
@@ -1,35 +1,73 @@
 from __future__ import annotations
 
+from collections import deque
 import random
-from typing import List, Tuple, TYPE_CHECKING
+from typing import Deque, List, Optional, Sequence, Tuple, TYPE_CHECKING
 
 import numpy as np
 import tcod
 
-from actions import Action, BumpAction, MeleeAction, MovementAction, WaitAction
+from actions import SUCCESS, Action, ActionResult, attack, bump, move
 
 if TYPE_CHECKING:
     from entity import Actor
 
 class BaseAI(Action):
+    # Which pathfinder `get_path_to` uses:
+    # "tcod" -- Dijkstra over `tcod.path.SimpleGraph`, routes around other blocking entities.
+    # "jps"  -- Jump point search over the walkable tiles only, much cheaper in open rooms
+    #           but other entities are ignored when planning.
+    # "alt"  -- A* guided by the map's landmarks, see `GameMap.build_landmarks`. Uses the
+    #           same costs as "tcod" and expands about 4x fewer nodes on long routes, but
+    #           the search is Python so each query is 4-5x slower than "tcod" in wall time,
+    #           20 ms against 4 ms on 400x240 maps.
+    pathfinder = "tcod"
+    # AIs with `attack`, `chase` and `follow_path` methods matching the categories of `triage`
+    # set this, the engine then only calls into them when there is real work to do. They must
+    # also have `plan`, `fallback`, `planned_turn` and `planner`, used when the engine's AI
+    # budget runs out.
+    triaged = False
+    # Triaged AIs whose `chase` and `follow_path` are `plan` followed by a step along `path`
+    # set this. Their steps can then be taken from `next_step` and resolved together with
+    # the other actors' moves, see `Engine.simultaneous_moves`.
+    simultaneous = False
+
     def perform(self) -> None:
         raise NotImplementedError()
-    
+
+    @property
+    def is_idle(self) -> bool:
+        """
+        Returns True if this AI has nothing in progress, idle actors far from the player
+        are made dormant by the engine.
+        """
+        return True
+
     def get_path_to(self, destination_x: int, destination_y: int) -> List[Tuple[int, int]]:
         """
         Compute and return a path to the target position.
 
         If there is no valid path then returns an empty list.
         """
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype=np.int8)
-        for entity in self.entity.gamemap.entities:
-            # Check that an entity blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position
-                # A lower numberr means more enemies will crowd behind each other in hallways.
-                # A higher number means enemies will take longer paths
-                # in order to surround the player
-                cost[entity.x, entity.y] +=10
+        if self.pathfinder == "jps":
+            return self.entity.gamemap.jump_point_search.path_to(
+                (self.entity.x, self.entity.y), (destination_x, destination_y)
+            )
+
+        cost = np.array(self.entity.gamemap.walkable, dtype=np.int8)
+        blockers = self.entity.gamemap.blockers
+        if blockers:
+            # Add to the cost of every blocked position that isn't already a wall.
+            # A lower numberr means more enemies will crowd behind each other in hallways.
+            # A higher number means enemies will take longer paths
+            # in order to surround the player
+            blocked = tuple(np.array(list(blockers), dtype=np.intp).T)
+            cost[blocked] += np.where(cost[blocked], 10, 0).astype(np.int8)
+
+        if self.pathfinder == "alt":
+            return self.entity.gamemap.landmarks.path_to(
+                (self.entity.x, self.entity.y), (destination_x, destination_y), cost
+            )
             
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
         pathfinder = tcod.path.Pathfinder(graph)
@@ -38,70 +76,284 @@ class BaseAI(Action):
         
         return [(index[0], index[1]) for index in path]
 
-class ConfusedEnemy(BaseAI):
+# Directions a confused actor may stumble in.
+DIRECTIONS = [
+    (-1, -1),
+    (0, -1),
+    (1, -1),
+    (-1, 0),
+    (1, 0),
+    (-1, 1),
+    (0, 1),
+    (1, 1),
+]
+
+def stumble(actor: Actor, rng: random.Random) -> ActionResult:
     """
-    A confused enemy will stumble around aimlessly for a given number of turns then revert
-    back If an actor occupies a tile it is randomly moving to it will attack.
+    Move in a direction drawn from rng, attacking any actor there, in place of the actor's
+    AI. Used for actors with the `status_effects.CONFUSED` effect.
     """
-    def __init__(
-            self, entity: Actor, 
-            previous_ai: BaseAI | None, 
-            turns_remaining: int
-    ) -> None:
-        super().__init__(entity)
-
-        self.previous_ai = previous_ai
-        self.turns_remaining = turns_remaining
-
-    def perform(self) -> None:
-        # Revert the API back to the origional state if the effect has
-        # run out
-        if self.turns_remaining <= 0:
-            self.engine.message_log.add_message(
-                f"The {self.entity.name} is no longer confused."
-            )
-            self.entity.ai = self.previous_ai
-        else:
-            direction_x, direction_y = random.choice(
-                [
-                    (-1, -1),
-                    (0, -1),
-                    (1, -1),
-                    (-1, 0),
-                    (1, 0),
-                    (-1, 1),
-                    (0, 1),
-                    (1, 1),
-                ]
-            )
-
-            self.turns_remaining -= 1
-
-            return BumpAction(self.entity, direction_x, direction_y).perform()
+    return bump(actor, *rng.choice(DIRECTIONS))
 
 class HostileEnemy(BaseAI):
+    triaged = True
+    simultaneous = True
+
     def __init__(self, entity: Actor) -> None:
         super().__init__(entity)
         self.path: List[Tuple[int, int]] = []
+        # The `Engine.turn` the path was last planned on.
+        self.planned_turn = -1
 
-    def perform(self) -> None:
+    @property
+    def is_idle(self) -> bool:
+        return not self.path
+
+    def perform(self) -> ActionResult:
         target = self.engine.player
-        dx = target.x - self.entity.x
-        dy = target.y - self.entity.y
-        distance = max(abs(dx), abs(dy)) # Chebshev distance.
+        distance = max(abs(target.x - self.entity.x), abs(target.y - self.entity.y)) # Chebshev distance.
 
         if self.engine.game_map.visible[self.entity.x, self.entity.y]:
             if distance <= 1:
-                return MeleeAction(self.entity, dx, dy).perform()
-            
-            self.path = self.get_path_to(target.x, target.y)
+                return self.attack()
+            return self.chase()
 
         if self.path:
-            dest_x, dest_y = self.path.pop(0)
-            return MovementAction(
-                self.entity,
-                dest_x - self.entity.x, 
-                dest_y - self.entity.y
-            ).perform()
+            return self.follow_path()
         
-        return WaitAction(self.entity).perform()
\ No newline at end of file
+        return SUCCESS
+
+    def attack(self) -> ActionResult:
+        """
+        Attack the adjacent player.
+        """
+        return attack(self.entity, self.engine.player)
+
+    @property
+    def planner(self) -> HostileEnemy:
+        """
+        Returns the AI whose `plan` searches for this one's path.
+        """
+        return self
+
+    def plan(self) -> None:
+        """
+        Plan a new path to the player.
+        """
+        target = self.engine.player
+        self.path = self.get_path_to(target.x, target.y)
+        self.planned_turn = self.engine.turn
+
+    def chase(self) -> ActionResult:
+        """
+        Plan a new path to the player, who can be seen, and take the first step.
+
+        The path isn't planned again if it was already planned this turn.
+        """
+        if self.planned_turn != self.engine.turn:
+            self.plan()
+        return self.follow_path()
+
+    def next_step(self) -> Optional[Tuple[int, int]]:
+        """
+        Return the next cell of the path without moving there or removing it, or None if
+        there is no path. It is removed once the step is taken, see `Engine.apply_moves`.
+        """
+        path = self.path
+        return path[0] if path else None
+
+    def fallback(self) -> ActionResult:
+        """
+        Chase without planning, by following the old path or else stepping straight towards
+        the player.
+        """
+        if self.path:
+            return self.follow_path()
+        target = self.engine.player
+        dx = (target.x > self.entity.x) - (target.x < self.entity.x)
+        dy = (target.y > self.entity.y) - (target.y < self.entity.y)
+        return move(self.entity, dx, dy)
+
+    def follow_path(self) -> ActionResult:
+        """
+        Take the next step along the current path, waiting if there is none.
+        """
+        if not self.path:
+            return SUCCESS
+        dest_x, dest_y = self.path.pop(0)
+        return move(self.entity, dest_x - self.entity.x, dest_y - self.entity.y)
+
+# Formation offsets from the pack leader, nearest first.
+FORMATION = [
+    (-1, 0), (0, -1), (1, 0), (0, 1),
+    (-1, -1), (1, -1), (-1, 1), (1, 1),
+    (-2, 0), (0, -2), (2, 0), (0, 2),
+]
+
+class Pack:
+    """
+    A group of monsters sharing one plan.
+
+    Only the leader, the first live member, plans a path. The others keep to a formation
+    slot next to the leader, or follow the trail of cells the leader walked through when
+    their slot can't be reached, such as in a corridor. This is one path search per pack
+    instead of one per monster, and the pack doesn't crowd into a corridor all at once.
+    """
+    def __init__(self, members: Sequence[Actor]) -> None:
+        self.members = list(members)
+        # Recent positions of the leader, newest last.
+        self.trail: Deque[Tuple[int, int]] = deque(maxlen=len(self.members) + 1)
+        for index, member in enumerate(self.members):
+            offset = FORMATION[(index - 1) % len(FORMATION)] if index else (0, 0)
+            member.ai = PackMember(member, self, offset, index)
+
+    @property
+    def leader(self) -> Optional[Actor]:
+        """
+        Returns the first live member still under pack AI.
+        """
+        return next(
+            (member for member in self.members if isinstance(member.ai, PackMember)), None
+        )
+
+    def plan(self) -> None:
+        """
+        Have the leader plan its path to the player, if it hasn't already this turn.
+        """
+        leader = self.leader
+        if leader is not None and leader.ai.planned_turn != leader.ai.engine.turn:
+            leader.ai.plan()
+
+class PackMember(HostileEnemy):
+    """
+    A hostile enemy belonging to a `Pack`, the leader plans and the others follow.
+    """
+    simultaneous = False
+
+    def __init__(self, entity: Actor, pack: Pack, offset: Tuple[int, int], index: int) -> None:
+        self.pack = pack
+        self.offset = offset
+        self.index = index
+        super().__init__(entity)
+
+    @property
+    def is_leader(self) -> bool:
+        return self.pack.leader is self.entity
+
+    @property
+    def path(self) -> List[Tuple[int, int]]:
+        """
+        Members other than the leader share the leader's path, which they never step along
+        themselves, so that they are only idle when the leader is.
+        """
+        if self.is_leader:
+            return self._path
+        leader = self.pack.leader
+        return leader.ai._path
+
+    @path.setter
+    def path(self, value: List[Tuple[int, int]]) -> None:
+        self._path = value
+
+    @property
+    def planner(self) -> HostileEnemy:
+        return self.pack.leader.ai
+
+    def plan(self) -> None:
+        """
+        The leader plans its path, the others only have the pack plan once per turn.
+        """
+        if self.is_leader:
+            super().plan()
+            return
+        self.pack.plan()
+        self.planned_turn = self.engine.turn
+
+    def chase(self) -> ActionResult:
+        if self.is_leader:
+            return super().chase()
+        self.pack.plan()
+        return self.keep_formation()
+
+    def follow_path(self) -> ActionResult:
+        if not self.is_leader:
+            return self.keep_formation()
+        x, y = self.entity.x, self.entity.y
+        result = super().follow_path()
+        if (x, y) != (self.entity.x, self.entity.y):
+            self.pack.trail.append((x, y))
+        return result
+
+    def fallback(self) -> ActionResult:
+        if self.is_leader:
+            return super().fallback()
+        return self.keep_formation()
+
+    def keep_formation(self) -> ActionResult:
+        """
+        Step towards this member's slot next to the leader, or else along the leader's trail.
+        """
+        leader = self.pack.leader
+        game_map = self.entity.gamemap
+        slot_x, slot_y = leader.x + self.offset[0], leader.y + self.offset[1]
+        if game_map.in_bounds(slot_x, slot_y) and game_map.walkable[slot_x, slot_y]:
+            if self.step_towards(slot_x, slot_y):
+                return SUCCESS
+        trail = self.pack.trail
+        if trail:
+            trail_x, trail_y = trail[max(0, len(trail) - self.index)]
+            if self.step_towards(trail_x, trail_y):
+                return SUCCESS
+        self.step_towards(leader.x, leader.y)
+        return SUCCESS
+
+    def step_towards(self, target_x: int, target_y: int) -> bool:
+        """
+        Take a free step which gets closer to the target, returns False if there isn't one.
+        """
+        x, y = self.entity.x, self.entity.y
+        distance = max(abs(target_x - x), abs(target_y - y))
+        if distance == 0:
+            return True
+        steps = sorted(
+            (
+                (max(abs(target_x - x - dx), abs(target_y - y - dy)), abs(dx) + abs(dy), dx, dy)
+                for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy
+            )
+        )
+        for step_distance, _, dx, dy in steps:
+            if step_distance >= distance:
+                break
+            if move(self.entity, dx, dy).success:
+                return True
+        return False
+
+# Categories returned by `triage`.
+IDLE = 0
+FOLLOW_PATH = 1
+CHASE = 2
+ATTACK = 3
+
+def triage(actors: Sequence[Actor], target: Actor, visible: np.ndarray) -> np.ndarray:
+    """
+    Classify what each actor with a triaged AI will do this turn in one NumPy pass.
+
+    Returns one of ATTACK, CHASE, FOLLOW_PATH or IDLE per actor, matching the decisions
+    made by `HostileEnemy.perform`. Results for actors whose AI isn't triaged are
+    meaningless, those must be performed normally.
+    """
+    count = len(actors)
+    x = np.fromiter((actor.x for actor in actors), dtype=np.intp, count=count)
+    y = np.fromiter((actor.y for actor in actors), dtype=np.intp, count=count)
+    has_path = np.fromiter(
+        (bool(getattr(actor.ai, "path", None)) for actor in actors), dtype=np.bool_, count=count
+    )
+
+    in_view = visible[x, y]
+    distance = np.maximum(np.abs(x - target.x), np.abs(y - target.y))
+
+    return np.select(
+        [in_view & (distance <= 1), in_view, has_path],
+        [ATTACK, CHASE, FOLLOW_PATH],
+        default=IDLE,
+    )
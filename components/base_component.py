@@ -1,14 +1,25 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TypeVar, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
     from game_map import GameMap
 
+T = TypeVar("T", bound="BaseComponent")
+
 class BaseComponent:
     parent: Entity
 
+    def clone(self: T, parent: Entity) -> T:
+        """
+        Return a copy of this component for parent, see `Entity.clone`.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.parent = parent
+        return clone
+
     @property
     def gamemap(self) -> GameMap:
         return self.parent.parent
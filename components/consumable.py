@@ -4,11 +4,11 @@ from typing import Optional, TYPE_CHECKING
 
 import actions
 import color
-import components.ai
 import components.inventory
 from components.base_component import BaseComponent
 from exceptions import Impossible
 from input_handlers import AreaRangedAttackHandler, SingleRangedAttackHandler
+from status_effects import CONFUSED
 
 if TYPE_CHECKING:
     from entity import Actor, Item
@@ -63,10 +63,8 @@ class ConfusionConsumable(Consumable):
             f"The eyes of the {target.name} look vacant, as it starts to stumble around!",
             color.status_effect_applied,
         )
-        target.ai = components.ai.ConfusedEnemy(
-            entity=target, 
-            previous_ai=target.ai, 
-            turns_remaining=self.number_of_turns,
+        self.engine.status_effects.apply(
+            target, CONFUSED, self.number_of_turns, self.engine.turn
         )
         self.consume()
 
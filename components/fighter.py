@@ -12,11 +12,18 @@ if TYPE_CHECKING:
 class Fighter(BaseComponent):
     parent: Actor
 
-    def __init__(self, health: int, defence: int, power: int) -> None:
+    def __init__(self, health: int, defence: int, power: int, regeneration: int = 0) -> None:
+        """
+        regeneration -- number of turns to recover one health point, 0 never recovers.
+        """
         self.max_health = health
         self._health = health
         self.defence = defence
         self.power = power
+        self.regeneration = regeneration
+        # Total health lost so far, so that a hit is noticed even if health was recovered
+        # in the same turn.
+        self.damage_taken = 0
 
     @property
     def health(self) -> int:
@@ -27,7 +34,10 @@ class Fighter(BaseComponent):
         """
         Sets health to a value between zero and max_health
         """
-        self._health = max(0, min(value, self.max_health))
+        value = max(0, min(value, self.max_health))
+        if value < self._health:
+            self.damage_taken += self._health - value
+        self._health = value
         if self._health <= 0 and self.parent.ai:
             self.die()
 
@@ -42,6 +52,8 @@ class Fighter(BaseComponent):
 
         self.parent.char = "%"
         self.parent.color = (191, 0, 0)
+        self.gamemap.unblock(self.parent)
+        self.engine.status_effects.clear(self.parent)
         self.parent.blocks_movement = False
         self.parent.ai = None
         self.parent.name = f"remains of {self.parent.name}"
@@ -65,5 +77,12 @@ class Fighter(BaseComponent):
         self.health = new_health
         return amount_recovered
     
+    def regenerate(self, turn: int) -> None:
+        """
+        Recover health over time, called once per turn with the engine's turn counter.
+        """
+        if self.regeneration and self.parent.is_alive and turn % self.regeneration == 0:
+            self.heal(1)
+
     def damage(self, amount: int) -> None:
         self.health -= amount
\ No newline at end of file
@@ -14,6 +14,15 @@ class Inventory(BaseComponent):
         self.capacity = capacity
         self.items: List[Item] = []
 
+    def clone(self, parent: Actor) -> Inventory:
+        clone = super().clone(parent)
+        clone.items = []
+        for item in self.items:
+            item_clone = item.clone()
+            item_clone.parent = clone
+            clone.items.append(item_clone)
+        return clone
+
     def drop(self, item: Item) -> None:
         """
         Remove item from inventory and place it in the world in the players
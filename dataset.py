@@ -0,0 +1,258 @@
+"""
+Generate many floors at once into a single memory-mapped dataset file.
+
+Run from the project root with: python -m dataset OUTPUT --levels 100000
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import math
+import multiprocessing
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import entity_factories
+from procgen import BSP, CAVES, GENERATOR_VERSION, ROOMS
+from world import Floor, FloorParameters, generate_floor
+
+# A dataset file is the header, the names of the spawnable kinds separated by NUL, the
+# floor parameters as JSON, then three sections each starting on a page boundary: the
+# index with one record per level, the tiles of every level, and a fixed number of spawn
+# slots per level of which the index says how many are used. Everything is little-endian.
+MAGIC = b"PSLEVELS"
+# magic, generator version, number of levels, width, height, depth, spawn slots per level,
+# size of the kind names, size of the parameters.
+HEADER = struct.Struct("<8sIIIIIIII")
+ALIGNMENT = 4096
+# done is set once the level is written, so an interrupted run can be told apart.
+INDEX_DT = np.dtype(
+    [
+        ("seed", "<u8"),
+        ("start_x", "<u2"),
+        ("start_y", "<u2"),
+        ("stairs_x", "<u2"),
+        ("stairs_y", "<u2"),
+        ("spawn_count", "<u4"),
+        ("done", np.uint8),
+    ]
+)
+# pack is 0 for an entity outside any pack, otherwise its pack's number from 1, slot is
+# its index in the pack.
+SPAWN_DT = np.dtype(
+    [("kind", np.uint8), ("x", "<u2"), ("y", "<u2"), ("pack", "<u2"), ("slot", "<u2")]
+)
+
+def spawn_capacity(parameters: FloorParameters) -> int:
+    """
+    Return the most entities a floor generated from parameters can have.
+    """
+    width, height = parameters.map_width, parameters.map_height
+    if parameters.generator in (BSP, CAVES):
+        # No more rooms than leaves or sectors of room_max_size + 1 cells square.
+        size = parameters.room_max_size + 1
+        rooms = max(1, math.ceil(width / size) * math.ceil(height / size))
+    else:
+        rooms = parameters.max_rooms
+    per_room = parameters.max_monsters_per_room + parameters.max_items_per_room
+    return min(rooms * per_room, width * height)
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def _sections(
+    buffer: np.ndarray, count: int, width: int, height: int, capacity: int, offset: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return views of the index, tiles and spawns of a dataset starting at offset in buffer.
+
+    Each level's tiles are column-major like `Floor.tiles`.
+    """
+    offset = _align(offset)
+    index = np.ndarray((count,), INDEX_DT, buffer, offset)
+    offset = _align(offset + index.nbytes)
+    tiles = np.ndarray(
+        (count, width, height), np.uint8, buffer, offset, strides=(width * height, 1, width)
+    )
+    offset = _align(offset + tiles.nbytes)
+    spawns = np.ndarray((count, capacity), SPAWN_DT, buffer, offset)
+    return index, tiles, spawns
+
+def _write_levels(path: str, first: int, seeds: Sequence[int]) -> int:
+    """
+    Generate the levels from first on with seeds and write them in place, returning how many
+    were written. This is what worker processes run.
+    """
+    dataset = LevelDataset(path, writable=True)
+    kind_index = {name: kind for kind, name in enumerate(dataset.kinds)}
+    for number, seed in enumerate(seeds, first):
+        floor = generate_floor(dataset.depth, seed, dataset.parameters)
+        if len(floor.spawns) > dataset.spawn_capacity:
+            raise ValueError(
+                f"Seed {seed} spawned {len(floor.spawns)} entities,"
+                f" more than the {dataset.spawn_capacity} a level can hold."
+            )
+        spawns = dataset.spawns[number, : len(floor.spawns)]
+        spawns["kind"] = [kind_index[name] for name, _, _ in floor.spawns]
+        spawns["x"] = [x for _, x, _ in floor.spawns]
+        spawns["y"] = [y for _, _, y in floor.spawns]
+        spawns["pack"] = 0
+        spawns["slot"] = 0
+        for pack, members in enumerate(floor.packs, 1):
+            spawns["pack"][members] = pack
+            spawns["slot"][members] = range(len(members))
+        dataset.tiles[number] = floor.tiles
+        dataset.index[number] = (seed, *floor.player_start, *floor.downstairs, len(floor.spawns), 1)
+    dataset.buffer.flush()
+    return len(seeds)
+
+def generate_dataset(
+        path: str,
+        seeds: Sequence[int],
+        parameters: FloorParameters = FloorParameters(),
+        depth: int = 1,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+) -> None:
+    """
+    Generate a level from each seed with parameters and write them all to path.
+
+    The file is laid out and sized up front, then the seeds are handed out in chunks to a
+    pool of `workers` processes, by default one per core. Each level has a fixed place in
+    the file, so every worker writes its levels straight into its own mapping of it and
+    sends nothing back: the workers share no state and throughput grows with their number.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        # Several chunks per worker so they finish together, but few enough to be cheap.
+        chunk_size = max(1, min(256, len(seeds) // (workers * 4)))
+    kinds = "\0".join(entity_factories.spawnable).encode()
+    description = json.dumps(parameters._asdict()).encode()
+    capacity = spawn_capacity(parameters)
+    header = HEADER.pack(
+        MAGIC,
+        GENERATOR_VERSION,
+        len(seeds),
+        parameters.map_width,
+        parameters.map_height,
+        depth,
+        capacity,
+        len(kinds),
+        len(description),
+    )
+    start = HEADER.size + len(kinds) + len(description)
+    size = _align(start) + _align(len(seeds) * INDEX_DT.itemsize)
+    size += _align(len(seeds) * parameters.map_width * parameters.map_height)
+    size += len(seeds) * capacity * SPAWN_DT.itemsize
+    with open(path, "wb") as file:
+        file.write(header + kinds + description)
+        file.truncate(size)
+
+    # Spawn rather than fork, the same as `world.GameWorld`.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(_write_levels, path, first, list(seeds[first : first + chunk_size]))
+            for first in range(0, len(seeds), chunk_size)
+        ]
+        for future in futures:
+            future.result()
+
+class LevelDataset:
+    """
+    A dataset file written by `generate_dataset`, for random access to any of its levels.
+
+    The file is memory-mapped and `index`, `tiles` and `spawns` are views of it, so reading
+    a level copies nothing and only the pages it touches are read from disk.
+    """
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path = path
+        self.buffer = np.memmap(path, dtype=np.uint8, mode="r+" if writable else "r")
+        (
+            magic, self.generator_version, count, width, height, self.depth,
+            self.spawn_capacity, names_size, parameters_size,
+        ) = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a dataset file.")
+        offset = HEADER.size
+        self.kinds = bytes(self.buffer[offset : offset + names_size]).decode().split("\0")
+        offset += names_size
+        self.parameters = FloorParameters(
+            **json.loads(bytes(self.buffer[offset : offset + parameters_size]))
+        )
+        offset += parameters_size
+        self.index, self.tiles, self.spawns = _sections(
+            self.buffer, count, width, height, self.spawn_capacity, offset
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def complete(self) -> bool:
+        """
+        True if every level was written.
+        """
+        return bool(self.index["done"].all())
+
+    def level_spawns(self, number: int) -> np.ndarray:
+        """
+        Return a view of the spawns of a level.
+        """
+        return self.spawns[number, : self.index["spawn_count"][number]]
+
+    def floor(self, number: int) -> Floor:
+        """
+        Return a level as a `world.Floor`, its tiles are a view of the file.
+        """
+        record = self.index[number]
+        spawns = self.level_spawns(number)
+        packs: Dict[int, List[Tuple[int, int]]] = {}
+        for i, (pack, slot) in enumerate(zip(spawns["pack"].tolist(), spawns["slot"].tolist())):
+            if pack:
+                packs.setdefault(pack, []).append((slot, i))
+        return Floor(
+            depth=self.depth,
+            seed=int(record["seed"]),
+            tiles=self.tiles[number],
+            player_start=(int(record["start_x"]), int(record["start_y"])),
+            downstairs=(int(record["stairs_x"]), int(record["stairs_y"])),
+            spawns=[
+                (self.kinds[kind], x, y)
+                for kind, x, y in zip(
+                    spawns["kind"].tolist(), spawns["x"].tolist(), spawns["y"].tolist()
+                )
+            ],
+            packs=[[i for _, i in sorted(packs[pack])] for pack in sorted(packs)],
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a dataset of floors.")
+    parser.add_argument("output")
+    parser.add_argument("--levels", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--generator", choices=(ROOMS, BSP, CAVES), default=ROOMS)
+    parser.add_argument("--width", type=int, default=FloorParameters().map_width)
+    parser.add_argument("--height", type=int, default=FloorParameters().map_height)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    parameters = FloorParameters(
+        map_width=args.width, map_height=args.height, generator=args.generator
+    )
+    seeds = range(args.first_seed, args.first_seed + args.levels)
+    start_time = time.perf_counter()
+    generate_dataset(args.output, seeds, parameters, args.depth, args.workers)
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.levels} levels in {elapsed:.1f} s, {args.levels / elapsed:.0f} levels/s")
+
+if __name__ == "__main__":
+    main()
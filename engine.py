@@ -1,47 +1,437 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+import itertools
+import time
 
+import numpy as np
 from tcod.console import Console
 from tcod.map import compute_fov
+import tcod
 
+from actions import execute
+from activation import ActivationZones
+import color
+from components.ai import ATTACK, CHASE, FOLLOW_PATH, stumble, triage
 import exceptions
 from input_handlers import MainGameEventHandler
-from render_functions import render_bar, render_names_at_mouse_location
+from render_functions import render_bar, render_dungeon_level, render_names_at_mouse_location
+from rng import RNGStreams
 from message_log import MessageLog
+from movement import resolve_moves
+from scheduler import NORMAL_COST, TurnScheduler
+from status_effects import CONFUSED, StatusEffects
+
+# The share of the AI budget left for planning which catching up on deferred actors may use,
+# the rest is for actors planning on their own turn.
+DEFERRED_SHARE = 0.5
+# How much of the AI's reserve, see `Engine._ai_reserve`, is kept from one turn to the next.
+RESERVE_DECAY = 0.9
 
 if TYPE_CHECKING:
+    from actions import MultiTurnAction
+    from components.ai import HostileEnemy
     from entity import Actor
     from game_map import GameMap
     from input_handlers import EventHandler
+    from world import GameWorld
 
 class Engine:
-    game_map: GameMap
+    game_world: GameWorld
 
-    def __init__(self, player: Actor) -> None:
+    def __init__(
+            self,
+            player: Actor,
+            activation_radius: int = 20,
+            ai_budget: Optional[float] = None,
+            simultaneous_moves: bool = False,
+            seed: Optional[int] = None,
+    ) -> None:
         self.event_handler: EventHandler = MainGameEventHandler(self)
         self.player = player
         self.message_log = MessageLog()
         self.mouse_location = (0, 0)
+        # Number of player turns taken, used to know when per-turn caches are stale.
+        self.turn = 0
+        self._player_distance: Optional[np.ndarray] = None
+        self._player_distance_key: Optional[Tuple[int, GameMap]] = None
+        # Where the FOV was last computed from, it only changes when the player moves.
+        self._fov_key: Optional[Tuple[int, int, GameMap]] = None
+        self.scheduler = TurnScheduler()
+        # Actors further than this from the player go dormant until woken.
+        self.activation_radius = activation_radius
+        self.activation = ActivationZones(activation_radius)
+        # Seconds the AI may spend per player turn, None for no limit. Once it is spent,
+        # actors which would plan a path fall back to a cheap move and plan later instead.
+        self.ai_budget = ai_budget
+        self._ai_deadline: Optional[float] = None
+        # True once planning has been cut off this turn.
+        self._ai_cut_off = False
+        # Running average of the seconds one plan takes, a plan isn't started unless it is
+        # expected to finish before the deadline.
+        self._plan_seconds = 0.0
+        # Seconds of the budget kept back from planning, for plans running longer than
+        # expected and the moves, attacks and fallbacks still to come. It follows how
+        # long recent turns which cut planning off ran past their deadline, rising at once
+        # and decaying slowly.
+        self._ai_reserve = 0.0
+        # Actors which skipped planning, in the order they did so.
+        self.deferred: Dict[Actor, None] = {}
+        # Instrumentation for the last call to `handle_enemy_turns`.
+        self.ai_seconds = 0.0
+        self.ai_deferred = 0
+        # Number of turns where the AI went over its budget.
+        self.ai_overruns = 0
+        self.status_effects = StatusEffects()
+        # Resolve the steps of monsters acting at the same time together, instead of one
+        # after another, see `apply_moves`. Crowds then move as one instead of walking into
+        # each other's backs, but each actor costs more, not less: about 13 us against 7 us
+        # for a block of 4900 orcs in `benchmarks.simultaneous_moves`, since every step is
+        # applied where one at a time most of them fail early.
+        self.simultaneous_moves = simultaneous_moves
+        # Every random choice in the game is drawn from one of these, so the same seed
+        # replays the same game. A random seed is picked if none is given.
+        self.rng = RNGStreams(seed)
+
+    @property
+    def game_map(self) -> GameMap:
+        return self._game_map
+
+    @game_map.setter
+    def game_map(self, game_map: GameMap) -> None:
+        """
+        Install a new map. Actors near the player are scheduled to act now, the rest start
+        dormant.
+        """
+        self._game_map = game_map
+        self.scheduler = TurnScheduler()
+        self.activation = ActivationZones(self.activation_radius)
+        self.deferred = {}
+        # Sort so that the order actors act in doesn't depend on set iteration order.
+        for actor in sorted(game_map.actors, key=lambda actor: (actor.y, actor.x)):
+            if actor is self.player:
+                continue
+            if self.activation.is_far(actor, self.player.x, self.player.y):
+                self.activation.put_to_sleep(actor)
+            else:
+                self.scheduler.schedule(actor)
+
+    def wake(self, actor: Actor) -> None:
+        """
+        Reschedule an actor woken from dormancy.
+        """
+        if actor.is_alive:
+            self.scheduler.schedule(actor)
+
+    def make_noise(self, x: int, y: int, radius: int) -> None:
+        """
+        Wake dormant actors within radius of x, y.
+        """
+        for actor in self.activation.wake_noise(x, y, radius):
+            self.wake(actor)
+
+    def handle_enemy_turns(self, player_action_cost: int = NORMAL_COST) -> None:
+        """
+        Let every actor due before the player's next action take its turn.
+
+        `player_action_cost` is the cost of the action the player just took. Dormant actors
+        near the player or in view are woken first, idle actors that have wandered out of
+        range go dormant instead of being rescheduled.
+        """
+        self.turn += 1
+        self.player.fighter.regenerate(self.turn)
+        for effect in self.status_effects.advance(self.turn):
+            if effect.type.expire_message and effect.target.is_alive:
+                self.message_log.add_message(
+                    effect.type.expire_message.format(name=effect.target.name)
+                )
+        scheduler = self.scheduler
+        activation = self.activation
+        player = self.player
+        visible = self.game_map.visible
+
+        for actor in activation.wake_around(player.x, player.y, visible):
+            self.wake(actor)
+
+        player_next_turn = scheduler.time + scheduler.delay(player, player_action_cost)
+
+        start_time = time.perf_counter()
+        self.ai_deferred = 0
+        self._ai_cut_off = False
+        if self.ai_budget is None:
+            self._ai_deadline = None
+        else:
+            planning_seconds = max(0.0, self.ai_budget - self._ai_reserve)
+            self._ai_deadline = start_time + planning_seconds
+            self.plan_deferred(start_time + planning_seconds * DEFERRED_SHARE)
+
+        scheduler.begin_tick()
+        while True:
+            due = scheduler.pop_due(player_next_turn)
+            if not due:
+                break
+            self.run_actors(due)
+        scheduler.end_tick(player_next_turn)
+
+        end_time = time.perf_counter()
+        self.ai_seconds = end_time - start_time
+        if self._ai_cut_off:
+            overrun = end_time - self._ai_deadline
+            self._ai_reserve = min(max(overrun, self._ai_reserve * RESERVE_DECAY), self.ai_budget)
+        if self.ai_budget is not None and self.ai_seconds > self.ai_budget:
+            self.ai_overruns += 1
+
+    def plan_deferred(self, deadline: float) -> None:
+        """
+        Plan for actors which were deferred on earlier turns until deadline, oldest first,
+        so that the work is spread over the following turns.
+
+        This only gets a share of the budget, so that turns with a backlog still leave time
+        for actors planning on their own turn, and to move everyone within the budget.
+        """
+        deferred = self.deferred
+        visible = self.game_map.visible
+        while deferred and time.perf_counter() + self._plan_seconds < deadline:
+            actor = next(iter(deferred))
+            del deferred[actor]
+            if actor.is_alive and actor.parent is self.game_map and visible[actor.x, actor.y]:
+                self.plan(actor.ai)
+
+    def plan(self, ai: HostileEnemy) -> None:
+        """
+        Have ai plan its path, timing it for `over_budget`.
+        """
+        start_time = time.perf_counter()
+        ai.plan()
+        self._plan_seconds += (time.perf_counter() - start_time - self._plan_seconds) * 0.25
+
+    def over_budget(self) -> bool:
+        """
+        Return True if the AI has used up its planning budget for this turn, or another plan
+        would be expected to go over it.
+        """
+        if self._ai_deadline is None:
+            return False
+        if not self._ai_cut_off:
+            if time.perf_counter() + self._plan_seconds < self._ai_deadline:
+                return False
+            self._ai_cut_off = True
+        return True
+
+    def run_actors(self, due: List[Tuple[int, Actor]]) -> None:
+        """
+        Give each (time, actor) pair popped from the scheduler its turn, then reschedule it.
+
+        Actors with a triaged AI are classified all at once first, idle ones are
+        rescheduled without calling into their AI at all. With `simultaneous_moves` the
+        steps of AIs which support it are collected and resolved together at the end.
+        """
+        scheduler = self.scheduler
+        activation = self.activation
+        player = self.player
+        visible = self.game_map.visible
+        categories = triage([actor for _, actor in due], player, visible).tolist()
+        proposals: List[Tuple[Actor, Tuple[int, int]]] = []
 
-    def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
-            if entity.ai:
-                try:
-                    entity.ai.perform()
-                except exceptions.Impossible:
-                    pass
+        for (acted_at, entity), category in zip(due, categories):
+            ai = entity.ai
+            if ai is None:
+                continue  # Died earlier in this batch.
+            # AIs report failed moves as results, which are simply ignored here. Impossible
+            # is still caught for AIs which raise it.
+            try:
+                if entity.effects and CONFUSED.name in entity.effects:
+                    stumble(entity, self.rng.ai)
+                elif not ai.triaged:
+                    ai.perform()
+                elif category == ATTACK:
+                    ai.attack()
+                elif category == CHASE:
+                    # Pack members share their leader's plan, only the leader is deferred.
+                    planner = ai.planner
+                    if planner.planned_turn != self.turn:
+                        if self.over_budget():
+                            ai.fallback()
+                            self.deferred[planner.entity] = None
+                            self.ai_deferred += 1
+                            continue
+                        self.plan(planner)
+                    if not self.propose_step(ai, proposals):
+                        ai.chase()
+                elif category == FOLLOW_PATH:
+                    if not self.propose_step(ai, proposals):
+                        ai.follow_path()
+            except exceptions.Impossible:
+                pass
+
+        if proposals:
+            self.apply_moves(proposals)
+
+        for acted_at, entity in due:
+            if not entity.is_alive:
+                continue
+            if (
+                entity.ai.is_idle
+                and activation.is_far(entity, player.x, player.y)
+                and not visible[entity.x, entity.y]
+            ):
+                activation.put_to_sleep(entity)
+            else:
+                scheduler.schedule_at(entity, acted_at + scheduler.delay(entity, entity.ai.cost))
+
+    def propose_step(
+            self, ai: HostileEnemy, proposals: List[Tuple[Actor, Tuple[int, int]]]
+    ) -> bool:
+        """
+        With `simultaneous_moves`, add the next step of an AI which supports it to proposals
+        for `apply_moves` and return True. Returns False if the AI must move on its own.
+        """
+        if not (self.simultaneous_moves and ai.simultaneous):
+            return False
+        step = ai.next_step()
+        if step is not None:
+            proposals.append((ai.entity, step))
+        return True
+
+    def apply_moves(self, proposals: List[Tuple[Actor, Tuple[int, int]]]) -> None:
+        """
+        Resolve the proposed steps against each other with `movement.resolve_moves` and
+        move every actor whose step succeeded at once, removing the step from its path.
+        Actors whose step failed keep it as the next step of their path.
+        """
+        # Actors killed earlier in the batch no longer block, or move.
+        proposals = [(entity, step) for entity, step in proposals if entity.ai is not None]
+        if not proposals:
+            return
+        blockers = self.game_map.blockers
+        # One row per move, built in a single pass: source x, y, destination x, y and whether
+        # the destination holds a blocking entity now.
+        moves = np.fromiter(
+            itertools.chain.from_iterable(
+                (entity.x, entity.y, *step, step in blockers) for entity, step in proposals
+            ),
+            dtype=np.intp,
+            count=len(proposals) * 5,
+        ).reshape(-1, 5)
+        moved = resolve_moves(
+            self.game_map.walkable, moves[:, 4].astype(bool), moves[:, :2], moves[:, 2:4]
+        )
+
+        movers = list(itertools.compress(proposals, moved.tolist()))
+        for entity, _ in movers:
+            del blockers[entity.x, entity.y]
+        for entity, (x, y) in movers:
+            entity.x = x
+            entity.y = y
+            del entity.ai.path[0]
+        blockers.update({step: entity for entity, step in movers})
+
+    def visible_hostiles(self) -> Set[Actor]:
+        """
+        Return the live actors, other than the player, which are in view.
+        """
+        visible = self.game_map.visible
+        return {
+            actor for actor in self.game_map.actors
+            if actor is not self.player and visible[actor.x, actor.y]
+        }
+
+    def run_multi_turn(self, command: MultiTurnAction) -> bool:
+        """
+        Run the turns of a multi-turn command back to back, without rendering in between.
+
+        Enemy turns and FOV updates still happen after every step. The command is refused
+        while a hostile is in view, and stops when it is finished, when one of its actions is
+        impossible, when a hostile comes into view, when the player takes damage or when the
+        command reports an interruption.
+
+        Returns True if at least one turn was taken.
+        """
+        if self.visible_hostiles():
+            self.message_log.add_message(command.hostiles_in_view_message, color.impossible)
+            return False
+        turns = 0
+
+        while self.player.is_alive:
+            damage_taken = self.player.fighter.damage_taken
+            try:
+                action = command.next_action()
+            except exceptions.Impossible as exc:
+                self.message_log.add_message(exc.args[0], color.impossible)
+                break
+            if action is None:
+                break
+            result = execute(action)
+            if not result.success:
+                self.message_log.add_message(result.reason, color.impossible)
+                break
+
+            turns += 1
+            self.handle_enemy_turns(action.cost)
+            self.update_fov()
+
+            if self.player.fighter.damage_taken > damage_taken:
+                break
+            hostiles = self.visible_hostiles()
+            if hostiles:
+                self.message_log.add_message(f"You see a {next(iter(hostiles)).name}.")
+                break
+            if command.is_interrupted():
+                break
+
+        return turns > 0
+
+    def player_distance(self) -> np.ndarray:
+        """
+        Return the distance from the player to every explored walkable cell.
+
+        The map is computed at most once per turn and shared by everything that needs a
+        route from the player, such as the hover path and travel.
+        """
+        key = (self.turn, self.game_map)
+        if self._player_distance is None or self._player_distance_key != key:
+            cost = np.array(
+                self.game_map.tiles["walkable"] & self.game_map.explored, dtype=np.int8
+            )
+            distance = tcod.path.maxarray(cost.shape, dtype=np.int32)
+            distance[self.player.x, self.player.y] = 0
+            tcod.path.dijkstra2d(distance, cost, 2, 3, out=distance)
+            self._player_distance = distance
+            self._player_distance_key = key
+        return self._player_distance
+
+    def player_path_to(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """
+        Return the path from the player to x, y through explored tiles, excluding the player's
+        own position.
+
+        If there is no known path then returns an empty list.
+        """
+        if not self.game_map.in_bounds(x, y):
+            return []
+        distance = self.player_distance()
+        if distance[x, y] == np.iinfo(distance.dtype).max:
+            return []
+        path: List[List[int]] = tcod.path.hillclimb2d(distance, (x, y), True, True)[::-1].tolist()
+        return [(index[0], index[1]) for index in path[1:]]
 
     def update_fov(self) -> None:
         """
         Recompute the visble area based on the players point of view.
+
+        Does nothing if the player hasn't moved since the last update, the tiles don't
+        change during play.
         """
+        key = (self.player.x, self.player.y, self.game_map)
+        if key == self._fov_key:
+            return
+        self._fov_key = key
         self.game_map.visible[:] = compute_fov(
             self.game_map.tiles["transparent"],
             (self.player.x, self.player.y),
             radius=8,
         )
 
-        self.game_map.explored |= self.game_map.visible
+        self.game_map.update_explored()
     
     def render(self, console: Console) -> None:
         self.game_map.render(console)
@@ -61,4 +451,10 @@ class Engine:
             total_width=20,
         )
 
+        render_dungeon_level(
+            console=console,
+            dungeon_level=self.game_world.current_floor,
+            location=(0, 47),
+        )
+
         render_names_at_mouse_location(console=console, x=21, y=44, engine=self)
\ No newline at end of file
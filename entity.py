@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import copy
 import math
-from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
+from typing import Dict, Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
 
 from render_order import RenderOrder
+from scheduler import NORMAL_SPEED
 
 if TYPE_CHECKING:
     from components.ai import BaseAI
@@ -12,6 +12,7 @@ if TYPE_CHECKING:
     from components.fighter import Fighter
     from components.inventory import Inventory
     from game_map import GameMap
+    from status_effects import StatusEffect
 
 T = TypeVar("T", bound="Entity")
 
@@ -41,22 +42,38 @@ class Entity:
         self.render_order = render_order
         if parent:
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
 
     @property
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
 
 
+    def clone(self: T) -> T:
+        """
+        Return a new entity like this one, not placed anywhere yet.
+
+        The prototypes in `entity_factories` are cloned rather than deep copied. A clone
+        shares every value which is only ever replaced, never changed in place, such as its
+        name, char, color and its components' base stats, and gets its own copy of the state
+        which is changed in place, such as its AI and inventory, see `Actor.clone`. That is a
+        few flat dict copies where `copy.deepcopy` walks and memoizes the whole object graph.
+        Subclasses adding mutable state must copy it in `clone`.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.pop("parent", None)
+        return clone
+
     def spawn(self: T, gamemap: GameMap, x: int, y: int) -> T:
         """
         Spawn a copy of this instance at the given location
         """
-        clone = copy.deepcopy(self)
+        clone = self.clone()
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
     
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
@@ -64,15 +81,18 @@ class Entity:
         Place this entity at a new location. Handles moving across GameMaps.
         """
 
-        self.x = x
-        self.y = y
-
         if gamemap:
             if hasattr(self, "parent"):  # Possibly uninitialized.
                 if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
+                    self.gamemap.remove_entity(self)
+            # Also drop any stale index entry if the map was given this entity up front.
+            gamemap.unblock(self)
+            self.x = x
+            self.y = y
             self.parent = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
+        else:
+            self.move(x - self.x, y - self.y)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -81,8 +101,15 @@ class Entity:
         return math.sqrt((x - self.x) ** 2 + (y - self.y) ** 2)
 
     def move(self, dx: int, dy: int) -> None:
-        self.x += dx
-        self.y += dy
+        if self.blocks_movement:
+            gamemap = self.gamemap
+            gamemap.unblock(self)
+            self.x += dx
+            self.y += dy
+            gamemap.blockers[self.x, self.y] = self
+        else:
+            self.x += dx
+            self.y += dy
 
 
 class Actor(Entity):
@@ -97,6 +124,7 @@ class Actor(Entity):
             ai_cls: Type[BaseAI],
             figher: Fighter,
             inventory: Inventory,
+            speed: int = NORMAL_SPEED,
     ) -> None:
         super().__init__(
             x=x, 
@@ -108,6 +136,7 @@ class Actor(Entity):
             render_order=RenderOrder.ACTOR,
         )
 
+        self.ai_cls = ai_cls
         self.ai: Optional[BaseAI] = ai_cls(self)
         self.fighter = figher
         self.fighter.parent = self
@@ -115,6 +144,20 @@ class Actor(Entity):
         self.inventory = inventory
         self.inventory.parent = self
 
+        # Relative to NORMAL_SPEED, an actor with twice the speed acts twice as often.
+        self.speed = speed
+
+        # Active status effects by name, see `status_effects.StatusEffects`.
+        self.effects: Dict[str, StatusEffect] = {}
+
+    def clone(self) -> Actor:
+        clone = super().clone()
+        clone.ai = self.ai_cls(clone) if self.ai is not None else None
+        clone.fighter = self.fighter.clone(clone)
+        clone.inventory = self.inventory.clone(clone)
+        clone.effects = {}
+        return clone
+
     @property
     def is_alive(self) -> bool:
         """
@@ -143,4 +186,9 @@ class Item(Entity):
         )
 
         self.consumable = consumable
-        self.consumable.parent = self
\ No newline at end of file
+        self.consumable.parent = self
+
+    def clone(self) -> Item:
+        clone = super().clone()
+        clone.consumable = self.consumable.clone(clone)
+        return clone
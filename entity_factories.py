@@ -9,7 +9,7 @@ player = Actor(
     color=(255, 255, 255),
     name="Player", 
     ai_cls=HostileEnemy,
-    figher=Fighter(health=30, defence=2, power=5),
+    figher=Fighter(health=30, defence=2, power=5, regeneration=10),
     inventory=Inventory(capacity=26),
 )
 
@@ -57,4 +57,14 @@ fireball_scroll = Item(
     color=(255, 0, 0),
     name="Fireball Scroll",
     consumable=consumable.FireballDamageConsumable(damage=12, radius=3),
-)
\ No newline at end of file
+)
+
+# The entities procgen spawns by name, so that a floor can be stored as names and positions.
+spawnable = {
+    "orc": orc,
+    "troll": troll,
+    "health_potion": health_potion,
+    "lightning_scroll": lightning_scroll,
+    "confusion_scroll": confusion_scroll,
+    "fireball_scroll": fireball_scroll,
+}
@@ -1,15 +1,17 @@
 from __future__ import annotations
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 from tcod.console import Console
 
 from entity import Actor, Item
+from pathfinding import FrontierMap, JumpPointSearch, Landmarks
 import tile_types
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
+    from procgen import RectangularRoom
 
 class GameMap:
     def __init__(self, engine: Engine,  width: int, height: int, entities: Iterable[Entity] = ()) -> None:
@@ -17,14 +19,102 @@ class GameMap:
         self.width = width
         self.height = height
         self.entities = set(entities)
+        # The entity blocking movement at each location, kept up to date by `add_entity`,
+        # `remove_entity`, `Entity.move` and `Entity.place`.
+        self.blockers: Dict[Tuple[int, int], Entity] = {
+            (entity.x, entity.y): entity for entity in self.entities if entity.blocks_movement
+        }
         self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
         self.visible = np.full((width, height), fill_value=False, order="F")
         self.explored = np.full((width, height), fill_value=False, order="F")
+        self.downstairs_location = (0, 0)
+        # The rooms procgen carved, in the order they were carved.
+        self.rooms: List[RectangularRoom] = []
+        self._jump_point_search: Optional[JumpPointSearch] = None
+        self._landmarks: Optional[Landmarks] = None
+        self._frontier: Optional[FrontierMap] = None
+
+    @property
+    def tiles(self) -> np.ndarray:
+        return self._tiles
+
+    @tiles.setter
+    def tiles(self, value: np.ndarray) -> None:
+        self._tiles = value
+        # A view of the walkable flags, so that movement doesn't create one for every step.
+        self.walkable = value["walkable"]
 
     @property
     def gamemap(self) -> GameMap:
         return self
 
+    @property
+    def jump_point_search(self) -> JumpPointSearch:
+        """
+        Returns the jump point search pathfinder for this map, built on first use.
+
+        Call `invalidate_pathfinding` if the walkable tiles change.
+        """
+        if self._jump_point_search is None:
+            self._jump_point_search = JumpPointSearch(self.tiles["walkable"])
+        return self._jump_point_search
+
+    @property
+    def landmarks(self) -> Landmarks:
+        """
+        Returns the ALT landmark heuristic for this map, built with the defaults on first use
+        if `build_pathfinding` didn't build it.
+        """
+        if self._landmarks is None:
+            self.build_landmarks()
+        return self._landmarks
+
+    def build_landmarks(self, count: int = 8) -> Landmarks:
+        """
+        Preprocess `count` landmarks for long distance A* queries on this map.
+
+        This should be run once after the map has been generated, the time taken and
+        memory used are available as `preprocess_seconds` and `nbytes` on the result.
+        """
+        self._landmarks = Landmarks(self.tiles["walkable"], count)
+        return self._landmarks
+
+    def build_pathfinding(self) -> None:
+        """
+        Build the pathfinding data the actors on this map need ahead of time, so that it
+        isn't built during the first monster turn which uses it.
+        """
+        if any(getattr(actor.ai, "pathfinder", None) == "alt" for actor in self.actors):
+            self.build_landmarks()
+
+    @property
+    def frontier(self) -> FrontierMap:
+        """
+        Returns the distance map to the unexplored parts of this map, built on first use.
+
+        Once built it is kept up to date by `update_explored`.
+        """
+        if self._frontier is None:
+            self._frontier = FrontierMap(self.tiles["walkable"], self.explored)
+        return self._frontier
+
+    def invalidate_pathfinding(self) -> None:
+        """
+        Drop any pathfinding data cached for the current tiles.
+        """
+        self._jump_point_search = None
+        self._landmarks = None
+        self._frontier = None
+
+    def update_explored(self) -> None:
+        """
+        Add the visible area to the explored area.
+        """
+        newly_explored = self.visible & ~self.explored
+        self.explored |= newly_explored
+        if self._frontier is not None:
+            self._frontier.update(newly_explored)
+
     @property
     def actors(self) -> Iterator[Actor]:
         """
@@ -38,6 +128,28 @@ class GameMap:
     def items(self) -> Iterator[Item]:
         yield from (entity for entity in self.entities if isinstance(entity, Item))
 
+    def add_entity(self, entity: Entity) -> None:
+        """
+        Add an entity to this map at its current location.
+        """
+        self.entities.add(entity)
+        if entity.blocks_movement:
+            self.blockers[entity.x, entity.y] = entity
+
+    def remove_entity(self, entity: Entity) -> None:
+        """
+        Remove an entity from this map.
+        """
+        self.entities.discard(entity)
+        self.unblock(entity)
+
+    def unblock(self, entity: Entity) -> None:
+        """
+        Remove an entity from the blocker index, before it moves or stops blocking.
+        """
+        if self.blockers.get((entity.x, entity.y)) is entity:
+            del self.blockers[entity.x, entity.y]
+
     def get_blocking_entity_at_location(self, location_x: int, location_y: int) -> Optional[Entity]:
         """
         Test if an entity is blocking the location or not. If an entity is blocking
@@ -46,16 +158,13 @@ class GameMap:
         location_x -- the x component of the `game_map` coordinate to test.
         location_y -- the y component of the `game_map` coordinate to test.
         """
-        for entity in self.entities:
-            if entity.blocks_movement and entity.x == location_x and entity.y == location_y:
-                return entity
-            
-        return None
+        return self.blockers.get((location_x, location_y))
     
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        # Live actors always block movement, so they are all in the blocker index.
+        entity = self.blockers.get((x, y))
+        if isinstance(entity, Actor) and entity.is_alive:
+            return entity
             
         return None
 
@@ -7,12 +7,18 @@ import tcod
 import actions
 from actions import (
     Action,
+    AutoExploreAction,
     BumpAction,
+    MultiTurnAction,
     PickupAction,
+    RestAction,
+    RunAction,
+    TakeStairsAction,
+    TravelAction,
     WaitAction,
 )
 import color
-import exceptions
+from render_functions import render_hover_path
 
 if TYPE_CHECKING:
     from engine import Engine
@@ -45,6 +51,21 @@ WAIT_KEYS = {
     tcod.event.KeySym.PERIOD,
 }
 
+# Typing a number before a wait or a move repeats it that many times.
+COUNT_KEYS = {
+    tcod.event.KeySym.N0: 0,
+    tcod.event.KeySym.N1: 1,
+    tcod.event.KeySym.N2: 2,
+    tcod.event.KeySym.N3: 3,
+    tcod.event.KeySym.N4: 4,
+    tcod.event.KeySym.N5: 5,
+    tcod.event.KeySym.N6: 6,
+    tcod.event.KeySym.N7: 7,
+    tcod.event.KeySym.N8: 8,
+    tcod.event.KeySym.N9: 9,
+}
+MAX_COUNT = 999
+
 class EventHandler(tcod.event.EventDispatch[Action]):
     def __init__(self, engine: Engine) -> None:
         self.engine = engine
@@ -60,14 +81,17 @@ class EventHandler(tcod.event.EventDispatch[Action]):
         """
         if action is None:
             return False
+
+        if isinstance(action, MultiTurnAction):
+            # Multi-turn commands run their own enemy turns and FOV updates.
+            return self.engine.run_multi_turn(action)
         
-        try:
-            action.perform()
-        except exceptions.Impossible as exc:
-            self.engine.message_log.add_message(exc.args[0], color.impossible)
+        result = actions.execute(action)
+        if not result.success:
+            self.engine.message_log.add_message(result.reason, color.impossible)
             return False #No one gets a turn
         
-        self.engine.handle_enemy_turns()
+        self.engine.handle_enemy_turns(action.cost)
         self.engine.update_fov()
         return True
 
@@ -315,20 +339,49 @@ class AreaRangedAttackHandler(SelectIndexHandler):
         return self.callback((x, y))
 
 class LookHandler(SelectIndexHandler):
+    """
+    Lets the player look around the map, selecting a cell travels there.
+    """
     def on_index_selected(self, x: int, y: int) -> Action | None:
         self.engine.event_handler = MainGameEventHandler(self.engine)
+        return TravelAction(self.engine.player, x, y)
 
 class MainGameEventHandler(EventHandler): 
+    def __init__(self, engine: Engine) -> None:
+        super().__init__(engine)
+        # Repeat count typed before a command, None if there isn't one.
+        self.count: Optional[int] = None
+
+    def on_render(self, console: tcod.console.Console) -> None:
+        super().on_render(console)
+        render_hover_path(console, self.engine)
+
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[Action]:
         action: Optional[Action] = None
         key = event.sym
         player = self.engine.player
 
+        if key in COUNT_KEYS:
+            self.count = min((self.count or 0) * 10 + COUNT_KEYS[key], MAX_COUNT)
+            return None
+        count, self.count = self.count, None
+
         if key in MOVE_KEYS:
             dx, dy = MOVE_KEYS[key]
-            action = BumpAction(player, dx, dy)
+            if count:
+                action = RunAction(player, dx, dy, max_steps=count)
+            elif event.mod & (tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT):
+                action = RunAction(player, dx, dy)
+            else:
+                action = BumpAction(player, dx, dy)
+        elif key == tcod.event.KeySym.PERIOD and event.mod & (
+            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
+        ):
+            action = TakeStairsAction(player)
         elif key in WAIT_KEYS:
-            action = WaitAction(player)
+            action = RestAction(player, count) if count else WaitAction(player)
+        elif key == tcod.event.KeySym.r:
+            action = RestAction(player)
         elif key == tcod.event.KeySym.ESCAPE:
             raise SystemExit()
         elif key == tcod.event.KeySym.v:
@@ -341,6 +394,8 @@ class MainGameEventHandler(EventHandler):
             self.engine.event_handler = InventoryDropHandler(self.engine)
         elif key == tcod.event.KeySym.SLASH:
             self.engine.event_handler = LookHandler(self.engine)
+        elif key == tcod.event.KeySym.x:
+            action = AutoExploreAction(player)
 
         return action
 
@@ -1,45 +1,25 @@
 #!/usr/bin/env python3
-import copy
 import traceback
 import tcod
 
 import entity_factories
 import color
 from engine import Engine
-from procgen import generate_dungeon
+from world import GameWorld
 
 def main():
     screen_width = 80
     screen_height = 50
 
-    map_width = 80
-    map_height = 45
-
-    room_max_size = 10
-    room_min_size = 6
-    max_rooms = 30
-
-    max_monsters_per_room = 2
-    max_items_per_room = 2
-
     tileset = tcod.tileset.load_tilesheet(
         "dejavu10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
     )
 
-    player = copy.deepcopy(entity_factories.player)
+    player = entity_factories.player.clone()
     engine = Engine(player=player)
-    engine.game_map = generate_dungeon(
-        max_rooms=max_rooms,
-        room_min_size=room_min_size,
-        room_max_size=room_max_size,
-        map_width=map_width,
-        map_height=map_height,
-        max_monsters_per_room=max_monsters_per_room,
-        max_items_per_room=max_items_per_room,
-        engine=engine,
-    )
-
-    engine.update_fov()
+    # The map sizes and room counts of each floor are set in `world.floor_parameters`.
+    engine.game_world = GameWorld(engine)
+    engine.game_world.generate_floor()
 
     engine.message_log.add_message(
         "Hello and welcome, adventurer, to purple sonata!",
@@ -47,26 +27,30 @@ def main():
     )
     
 
-    with tcod.context.new_terminal(
-        screen_width,
-        screen_height,
-        tileset=tileset,
-        title="Purple Sonata",
-        vsync=True,
-    ) as context:
-        root_console = tcod.console.Console(screen_width, screen_height, order="F")
-        while True:
-            root_console.clear()
-            engine.event_handler.on_render(console=root_console)
-            context.present(root_console)
-
-            try:
-                for event in tcod.event.wait():
-                    context.convert_event(event)
-                    engine.event_handler.handle_events(event)
-            except Exception:
-                traceback.print_exc()
-                engine.message_log.add_message(traceback.format_exc(), color.error)
+    try:
+        with tcod.context.new_terminal(
+            screen_width,
+            screen_height,
+            tileset=tileset,
+            title="Purple Sonata",
+            vsync=True,
+        ) as context:
+            root_console = tcod.console.Console(screen_width, screen_height, order="F")
+            while True:
+                root_console.clear()
+                engine.event_handler.on_render(console=root_console)
+                context.present(root_console)
+
+                try:
+                    for event in tcod.event.wait():
+                        context.convert_event(event)
+                        engine.event_handler.handle_events(event)
+                except Exception:
+                    traceback.print_exc()
+                    engine.message_log.add_message(traceback.format_exc(), color.error)
+    finally:
+        # Don't leave the worker generating the next floor behind.
+        engine.game_world.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
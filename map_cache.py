@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import struct
+import time
+from typing import Optional
+
+import numpy as np
+
+import entity_factories
+from procgen import GENERATOR_VERSION
+from world import Floor, FloorParameters, generate_floor
+
+# A floor file is the header, the names of the spawnable kinds separated by NUL, the tiles
+# as one `tile_types.palette` index per tile in column-major order, the spawns, then the
+# size of each pack and the spawn indices of their members. Everything is little-endian.
+MAGIC = b"PSFLOOR1"
+# magic, width, height, depth, seed, player start x and y, downstairs x and y,
+# size of the kind names, number of spawns, number of packs.
+HEADER = struct.Struct("<8sIIIQiiiiIII")
+SPAWN_DT = np.dtype([("kind", np.uint8), ("x", "<u2"), ("y", "<u2")])
+
+def dump_floor(floor: Floor) -> bytes:
+    """
+    Return floor in the compact binary form read by `load_floor`.
+    """
+    kinds = list(entity_factories.spawnable)
+    kind_index = {name: index for index, name in enumerate(kinds)}
+    names = "\0".join(kinds).encode()
+    spawns = np.array(
+        [(kind_index[name], x, y) for name, x, y in floor.spawns], dtype=SPAWN_DT
+    )
+    sizes = np.array([len(members) for members in floor.packs], dtype="<u4")
+    members = np.array([index for pack in floor.packs for index in pack], dtype="<u4")
+    width, height = floor.tiles.shape
+    header = HEADER.pack(
+        MAGIC,
+        width,
+        height,
+        floor.depth,
+        floor.seed,
+        *floor.player_start,
+        *floor.downstairs,
+        len(names),
+        len(spawns),
+        len(sizes),
+    )
+    return b"".join(
+        (
+            header,
+            names,
+            np.asarray(floor.tiles, dtype=np.uint8).tobytes(order="F"),
+            spawns.tobytes(),
+            sizes.tobytes(),
+            members.tobytes(),
+        )
+    )
+
+def load_floor(buffer: bytes) -> Floor:
+    """
+    Return the floor stored in buffer by `dump_floor`.
+
+    The tiles are a read-only view of buffer, not a copy.
+    """
+    (
+        magic, width, height, depth, seed, start_x, start_y, stairs_x, stairs_y,
+        names_size, spawn_count, pack_count,
+    ) = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a floor file.")
+    offset = HEADER.size
+    kinds = bytes(buffer[offset : offset + names_size]).decode().split("\0")
+    offset += names_size
+    tiles = np.frombuffer(buffer, np.uint8, width * height, offset)
+    offset += tiles.nbytes
+    spawns = np.frombuffer(buffer, SPAWN_DT, spawn_count, offset)
+    offset += spawns.nbytes
+    sizes = np.frombuffer(buffer, "<u4", pack_count, offset)
+    offset += sizes.nbytes
+    members = np.frombuffer(buffer, "<u4", int(sizes.sum()), offset).tolist()
+    packs = []
+    start = 0
+    for size in sizes.tolist():
+        packs.append(members[start : start + size])
+        start += size
+    return Floor(
+        depth=depth,
+        seed=seed,
+        tiles=tiles.reshape((width, height), order="F"),
+        player_start=(start_x, start_y),
+        downstairs=(stairs_x, stairs_y),
+        spawns=[(kinds[kind], x, y) for kind, x, y in spawns.tolist()],
+        packs=packs,
+    )
+
+class MapCache:
+    """
+    Generated floors stored on disk, keyed by a hash of the generator version, the seed and
+    the generation parameters.
+
+    Each floor is one file in the format of `dump_floor`, loaded with a single read. The
+    files are kept under `max_bytes` in total by deleting the least recently used first.
+    A file's modification time is its last use, so the order survives between runs.
+    """
+    SUFFIX = ".floor"
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # The size of each file by key, least recently used first.
+        self.entries: OrderedDict[str, int] = OrderedDict()
+        files = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[: -len(self.SUFFIX)], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+        self.total_bytes = sum(self.entries.values())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(seed: int, parameters: FloorParameters) -> str:
+        description = json.dumps(
+            [GENERATOR_VERSION, seed, parameters._asdict()], sort_keys=True
+        )
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def has(self, seed: int, parameters: FloorParameters) -> bool:
+        """
+        Return True if the floor is cached, without counting a hit or a miss.
+        """
+        return self.key(seed, parameters) in self.entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, seed: int, parameters: FloorParameters) -> Optional[Floor]:
+        """
+        Return the cached floor, or None if it isn't cached.
+
+        A file which can't be read as a floor, such as one cut short, is deleted and counts
+        as a miss.
+        """
+        key = self.key(seed, parameters)
+        if key in self.entries:
+            path = self.path(key)
+            try:
+                with open(path, "rb") as file:
+                    floor = load_floor(file.read())
+            except FileNotFoundError:
+                # Deleted behind our back.
+                self.total_bytes -= self.entries.pop(key)
+            except (ValueError, IndexError, struct.error):
+                self.total_bytes -= self.entries.pop(key)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                now = time.time()
+                os.utime(path, (now, now))
+                return floor
+        self.misses += 1
+        return None
+
+    def put(self, floor: Floor, parameters: FloorParameters) -> None:
+        """
+        Store a floor generated from parameters, evicting old floors if over the size limit.
+        """
+        key = self.key(floor.seed, parameters)
+        data = dump_floor(floor)
+        if len(data) > self.max_bytes:
+            return
+        path = self.path(key)
+        # Write then rename, so a reader never sees half a file.
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+        self.total_bytes += len(data) - self.entries.pop(key, 0)
+        self.entries[key] = len(data)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Delete the least recently used floors until the cache is within its size limit.
+        """
+        while self.total_bytes > self.max_bytes and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def load_or_generate(self, depth: int, seed: int, parameters: FloorParameters) -> Floor:
+        """
+        Return the floor from the cache, generating and storing it on a miss.
+        """
+        floor = self.get(seed, parameters)
+        if floor is None:
+            floor = generate_floor(depth, seed, parameters)
+            self.put(floor, parameters)
+        # The same seed and parameters give the same floor at any depth.
+        return floor._replace(depth=depth)
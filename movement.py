@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import numpy as np
+
+def resolve_moves(
+        walkable: np.ndarray,
+        occupied: np.ndarray,
+        sources: np.ndarray,
+        destinations: np.ndarray,
+) -> np.ndarray:
+    """
+    Decide which of a set of simultaneous moves succeed, returns a boolean per move.
+
+    walkable     -- the walkable tiles of the map.
+    occupied     -- (N,) array, True where the destination holds a blocking entity now,
+                    which may be another mover.
+    sources      -- (N, 2) array of where each mover stands, no two the same.
+    destinations -- (N, 2) array of where each mover wants to go.
+
+    A move fails if its destination is out of bounds or not walkable, if an earlier mover in
+    the list wants the same cell, or if the cell is occupied by something that isn't moving
+    out of it. A move into a cell being vacated succeeds only if that move succeeds, so
+    chains of movers following each other all move at once. Movers in a cycle, including
+    two swapping places, all fail. The result depends only on the order of the movers.
+    """
+    count = len(sources)
+    width, height = walkable.shape
+    dest_x = destinations[:, 0]
+    dest_y = destinations[:, 1]
+
+    ok = (0 <= dest_x) & (dest_x < width) & (0 <= dest_y) & (dest_y < height)
+    dest_x = np.where(ok, dest_x, 0)
+    dest_y = np.where(ok, dest_y, 0)
+    ok &= walkable[dest_x, dest_y]
+
+    # Only the first mover to want a cell may take it. Moves which already failed get keys
+    # of their own so they can't take a cell from anyone.
+    dest_key = np.where(ok, dest_x * height + dest_y, -1 - np.arange(count))
+    _, first = np.unique(dest_key, return_index=True)
+    is_first = np.zeros(count, dtype=bool)
+    is_first[first] = True
+    ok &= is_first
+
+    # Index of the mover standing in each destination, or -1, looked up among the sorted
+    # sources so the cost depends on the number of movers rather than the size of the map.
+    source_key = sources[:, 0] * height + sources[:, 1]
+    order = np.argsort(source_key)
+    sorted_keys = source_key[order]
+    found = np.minimum(np.searchsorted(sorted_keys, dest_key), count - 1)
+    following = np.where(ok & (sorted_keys[found] == dest_key), order[found], -1)
+    # Occupied by something which isn't moving at all.
+    ok &= ~(occupied & (following == -1))
+
+    # Follow each chain of movers to its end by pointer jumping: every round each mover takes
+    # on the result of the one it follows and then skips ahead to that one's target, so the
+    # chain length covered doubles each round.
+    for _ in range(max(1, int(count).bit_length()) + 1):
+        chained = following != -1
+        if not chained.any():
+            break
+        targets = following[chained]
+        ok[chained] &= ok[targets]
+        following[chained] = following[targets]
+    # Still following someone after enough rounds to cover any chain, so part of a cycle or
+    # following one.
+    ok &= following == -1
+    return ok
@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import tcod
+
+# Movement costs, these match the costs used by the tcod pathfinder in `BaseAI.get_path_to`.
+CARDINAL_COST = 2
+DIAGONAL_COST = 3
+
+def octile_distance(dx: int, dy: int) -> int:
+    """
+    Return the cost of the cheapest unobstructed route covering the given offset.
+    """
+    dx = abs(dx)
+    dy = abs(dy)
+    if dx < dy:
+        dx, dy = dy, dx
+    return CARDINAL_COST * (dx - dy) + DIAGONAL_COST * dy
+
+def astar(
+    cost: np.ndarray,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    heuristic: Callable[[int, int], int],
+) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    A* over a cost array with the same edge costs as `tcod.path.SimpleGraph`.
+
+    Entering a cell costs its value times CARDINAL_COST or DIAGONAL_COST, zero is blocked.
+    Returns the path excluding start and including goal, and the number of nodes expanded.
+    If there is no valid path then the path is an empty list.
+    """
+    width, height = cost.shape
+    start = int(start[0]), int(start[1])
+    goal = int(goal[0]), int(goal[1])
+    if start == goal or not cost[goal]:
+        return [], 0
+
+    came_from: Dict[Tuple[int, int], Tuple[int, int]] = {start: start}
+    distance: Dict[Tuple[int, int], int] = {start: 0}
+    # Ties on the estimate are broken towards the node furthest from the start.
+    open_list = [(heuristic(*start), 0, start)]
+    expanded = 0
+
+    while open_list:
+        _, node_distance, node = heapq.heappop(open_list)
+        node_distance = -node_distance
+        if node_distance > distance[node]:
+            continue  # Stale entry.
+        expanded += 1
+        if node == goal:
+            path = []
+            while node != start:
+                path.append(node)
+                node = came_from[node]
+            path.reverse()
+            return path, expanded
+
+        x, y = node
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                next_x = x + dx
+                next_y = y + dy
+                if not (0 <= next_x < width and 0 <= next_y < height):
+                    continue
+                cell_cost = int(cost[next_x, next_y])
+                if not cell_cost or not (dx or dy):
+                    continue
+                next_distance = node_distance + cell_cost * (
+                    DIAGONAL_COST if dx and dy else CARDINAL_COST
+                )
+                next_node = (next_x, next_y)
+                if next_distance >= distance.get(next_node, next_distance + 1):
+                    continue
+                distance[next_node] = next_distance
+                came_from[next_node] = node
+                heapq.heappush(
+                    open_list, (next_distance + heuristic(next_x, next_y), -next_distance, next_node)
+                )
+
+    return [], expanded
+
+class Landmarks:
+    """
+    Preprocessed distances for the ALT (A*, landmarks, triangle inequality) heuristic.
+
+    `count` landmarks are picked far apart from each other and the distance from each one
+    to every cell is stored. For any landmark L, |d(L, goal) - d(L, cell)| never
+    overestimates d(cell, goal), the largest of these bounds steers A* around walls and
+    dead-end rooms that a straight line heuristic would walk into.
+
+    Distances are measured over the walkable tiles only, so they stay admissible when
+    extra costs such as blocking entities are added to the cost array of a query.
+    """
+    def __init__(self, walkable: np.ndarray, count: int = 8) -> None:
+        start_time = time.perf_counter()
+
+        cost = np.array(walkable, dtype=np.int8)
+        self.cost = cost
+        distances: List[np.ndarray] = []
+        self.positions: List[Tuple[int, int]] = []
+
+        floor = np.argwhere(cost)
+        if len(floor):
+            # The first landmark is the cell furthest from an arbitrary floor cell,
+            # then each new landmark is the cell furthest from all previous landmarks.
+            nearest = self._distance_from(cost, tuple(floor[0]))
+            for _ in range(count):
+                reachable = nearest != np.iinfo(nearest.dtype).max
+                candidates = np.where(reachable, nearest, -1)
+                position = np.unravel_index(int(np.argmax(candidates)), cost.shape)
+                position = int(position[0]), int(position[1])
+                if position in self.positions:
+                    break  # Fewer cells than landmarks.
+                self.positions.append(position)
+                distance = self._distance_from(cost, position)
+                distances.append(distance)
+                nearest = np.minimum(nearest, distance) if len(distances) > 1 else distance
+
+        # Store the table cell-major so that one lookup returns every landmark distance.
+        table = np.stack(distances, axis=-1) if distances else np.zeros(cost.shape + (0,), np.int32)
+        unreachable = table == np.iinfo(np.int32).max
+        if table.size and table[~unreachable].max(initial=0) < np.iinfo(np.uint16).max:
+            self.unreachable = int(np.iinfo(np.uint16).max)
+            self.table = np.where(unreachable, self.unreachable, table).astype(np.uint16)
+        else:
+            self.unreachable = int(np.iinfo(np.int32).max)
+            self.table = np.ascontiguousarray(table, dtype=np.int32)
+
+        # Number of nodes expanded by the last query.
+        self.nodes_expanded = 0
+        self.preprocess_seconds = time.perf_counter() - start_time
+
+    @staticmethod
+    def _distance_from(cost: np.ndarray, position: Tuple[int, int]) -> np.ndarray:
+        distance = tcod.path.maxarray(cost.shape, dtype=np.int32)
+        distance[position] = 0
+        tcod.path.dijkstra2d(distance, cost, CARDINAL_COST, DIAGONAL_COST, out=distance)
+        return distance
+
+    @property
+    def count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the landmark distance table, in bytes.
+        """
+        return self.table.nbytes
+
+    def heuristic(self, goal: Tuple[int, int]) -> Callable[[int, int], int]:
+        """
+        Return the landmark lower bound on the distance from a cell to goal.
+        """
+        goal_distances = self.table[goal].astype(np.int64)
+        # Landmarks which can not reach the goal give no information.
+        usable = goal_distances != self.unreachable
+        table = self.table[..., usable] if not usable.all() else self.table
+        goal_distances = goal_distances[usable]
+        goal_x, goal_y = goal
+        if not goal_distances.size:
+            return lambda x, y: octile_distance(goal_x - x, goal_y - y)
+
+        def landmark_bound(x: int, y: int) -> int:
+            # The straight line bound is still valid and wins close to the goal.
+            return max(
+                int(np.abs(table[x, y] - goal_distances).max()),
+                octile_distance(goal_x - x, goal_y - y),
+            )
+
+        return landmark_bound
+
+    def path_to(
+            self,
+            start: Tuple[int, int],
+            goal: Tuple[int, int],
+            cost: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, int]]:
+        """
+        Return the path from start to goal, excluding start and including goal.
+
+        `cost` defaults to the walkable tiles the landmarks were built from, costs may only
+        be raised from there. If there is no valid path then returns an empty list.
+        """
+        if cost is None:
+            cost = self.cost
+        goal = int(goal[0]), int(goal[1])
+        path, self.nodes_expanded = astar(cost, start, goal, self.heuristic(goal))
+        return path
+
+class JumpPointSearch:
+    """
+    A* with jump point pruning over a uniform-cost grid.
+
+    Instead of pushing every neighbour onto the open list, straight and diagonal runs
+    are scanned until they hit a "jump point", a cell with a forced neighbour caused by
+    a wall. Only jump points are expanded, so open rooms cost a handful of nodes.
+
+    The grid is copied once into a padded byte string so that each lookup is a plain
+    index, this object should be built once per map and reused for every query.
+    Diagonal moves may pass between walls, like `tcod.path.SimpleGraph`.
+    """
+    def __init__(self, walkable: np.ndarray) -> None:
+        self.width, self.height = walkable.shape
+        self.stride = self.height + 2
+
+        padded = np.zeros((self.width + 2, self.height + 2), dtype=np.bool_)
+        padded[1:-1, 1:-1] = walkable
+        self.grid = padded.tobytes()
+
+        # Number of nodes taken from the open list by the last query.
+        self.nodes_expanded = 0
+
+    def _index(self, x: int, y: int) -> int:
+        return (x + 1) * self.stride + y + 1
+
+    def _xy(self, index: int) -> Tuple[int, int]:
+        x, y = divmod(index, self.stride)
+        return x - 1, y - 1
+
+    def _jump_straight(self, index: int, step: int, side: int, goal: int) -> int:
+        """
+        Scan from `index` along `step` and return the first jump point, or -1.
+
+        `side` is the flat offset perpendicular to `step`.
+        """
+        grid = self.grid
+        while True:
+            index += step
+            if not grid[index]:
+                return -1
+            if index == goal:
+                return index
+            if (grid[index + step + side] and not grid[index + side]) or (
+                grid[index + step - side] and not grid[index - side]
+            ):
+                return index
+
+    def _jump_diagonal(self, index: int, step_x: int, step_y: int, goal: int) -> int:
+        """
+        Scan diagonally from `index` and return the first jump point, or -1.
+        """
+        grid = self.grid
+        step = step_x + step_y
+        while True:
+            index += step
+            if not grid[index]:
+                return -1
+            if index == goal:
+                return index
+            if (grid[index - step_x + step_y] and not grid[index - step_x]) or (
+                grid[index + step_x - step_y] and not grid[index - step_y]
+            ):
+                return index
+            if (
+                self._jump_straight(index, step_x, 1, goal) >= 0
+                or self._jump_straight(index, step_y, self.stride, goal) >= 0
+            ):
+                return index
+
+    def _directions(self, index: int, dx: int, dy: int) -> List[Tuple[int, int]]:
+        """
+        Return the pruned set of directions to search from a node entered moving (dx, dy).
+        """
+        grid = self.grid
+        step_x = dx * self.stride
+        step_y = dy
+
+        if dx and dy:
+            directions = []
+            if grid[index + step_y]:
+                directions.append((0, dy))
+            if grid[index + step_x]:
+                directions.append((dx, 0))
+            if grid[index + step_x + step_y]:
+                directions.append((dx, dy))
+            if not grid[index - step_x]:
+                directions.append((-dx, dy))
+            if not grid[index - step_y]:
+                directions.append((dx, -dy))
+            return directions
+
+        if dx:
+            directions = [(dx, 0)] if grid[index + step_x] else []
+            if not grid[index + 1]:
+                directions.append((dx, 1))
+            if not grid[index - 1]:
+                directions.append((dx, -1))
+            return directions
+
+        directions = [(0, dy)] if grid[index + step_y] else []
+        if not grid[index + self.stride]:
+            directions.append((1, dy))
+        if not grid[index - self.stride]:
+            directions.append((-1, dy))
+        return directions
+
+    def path_to(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """
+        Return the path from start to goal, excluding start and including goal.
+
+        If there is no valid path then returns an empty list.
+        """
+        self.nodes_expanded = 0
+        start = int(start[0]), int(start[1])
+        goal = int(goal[0]), int(goal[1])
+        start_index = self._index(*start)
+        goal_index = self._index(*goal)
+        if start_index == goal_index or not self.grid[goal_index]:
+            return []
+
+        goal_x, goal_y = goal
+        stride = self.stride
+
+        came_from: Dict[int, int] = {start_index: start_index}
+        direction: Dict[int, Tuple[int, int]] = {start_index: (0, 0)}
+        cost: Dict[int, int] = {start_index: 0}
+        open_list = [(octile_distance(goal_x - start[0], goal_y - start[1]), 0, start_index)]
+
+        all_directions = [
+            (dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy
+        ]
+
+        while open_list:
+            _, node_cost, index = heapq.heappop(open_list)
+            if node_cost > cost[index]:
+                continue  # Stale entry.
+            self.nodes_expanded += 1
+            if index == goal_index:
+                return self._reconstruct(came_from, goal_index)
+
+            dx, dy = direction[index]
+            directions = self._directions(index, dx, dy) if dx or dy else all_directions
+
+            x, y = self._xy(index)
+            for dx, dy in directions:
+                if dx and dy:
+                    jump = self._jump_diagonal(index, dx * stride, dy, goal_index)
+                elif dx:
+                    jump = self._jump_straight(index, dx * stride, 1, goal_index)
+                else:
+                    jump = self._jump_straight(index, dy, stride, goal_index)
+                if jump < 0:
+                    continue
+
+                jump_x, jump_y = self._xy(jump)
+                new_cost = node_cost + octile_distance(jump_x - x, jump_y - y)
+                if new_cost >= cost.get(jump, new_cost + 1):
+                    continue
+                cost[jump] = new_cost
+                came_from[jump] = index
+                direction[jump] = (dx, dy)
+                heapq.heappush(
+                    open_list,
+                    (new_cost + octile_distance(goal_x - jump_x, goal_y - jump_y), new_cost, jump),
+                )
+
+        return []
+
+    def _reconstruct(self, came_from: Dict[int, int], goal_index: int) -> List[Tuple[int, int]]:
+        """
+        Expand the chain of jump points ending at goal_index into single steps.
+        """
+        jump_points = [goal_index]
+        while came_from[jump_points[-1]] != jump_points[-1]:
+            jump_points.append(came_from[jump_points[-1]])
+        jump_points.reverse()
+
+        path: List[Tuple[int, int]] = []
+        x, y = self._xy(jump_points[0])
+        for jump in jump_points[1:]:
+            jump_x, jump_y = self._xy(jump)
+            step_x = (jump_x > x) - (jump_x < x)
+            step_y = (jump_y > y) - (jump_y < y)
+            while (x, y) != (jump_x, jump_y):
+                x += step_x
+                y += step_y
+                path.append((x, y))
+        return path
+
+class FrontierMap:
+    """
+    Distance from every walkable cell to the nearest unexplored walkable cell.
+
+    The map is built once and then repaired in place with `update` as cells become
+    explored: only cells whose distance depended on a newly explored cell are
+    recomputed, so each step of exploration touches a small local area.
+    """
+    def __init__(self, walkable: np.ndarray, explored: np.ndarray) -> None:
+        self.walkable = np.array(walkable, dtype=np.bool_)
+        self.width, self.height = self.walkable.shape
+        self.distance = tcod.path.maxarray(self.walkable.shape, dtype=np.int32)
+        self.unreachable = int(np.iinfo(np.int32).max)
+        self.distance[self.walkable & ~explored] = 0
+        tcod.path.dijkstra2d(
+            self.distance,
+            self.walkable.astype(np.int8),
+            CARDINAL_COST,
+            DIAGONAL_COST,
+            out=self.distance,
+        )
+
+    def _neighbours(self, x: int, y: int) -> List[Tuple[int, int, int]]:
+        """
+        Return (x, y, step_cost) for the walkable cells around x, y.
+        """
+        neighbours = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if not (dx or dy):
+                    continue
+                next_x = x + dx
+                next_y = y + dy
+                if 0 <= next_x < self.width and 0 <= next_y < self.height and (
+                    self.walkable[next_x, next_y]
+                ):
+                    neighbours.append(
+                        (next_x, next_y, DIAGONAL_COST if dx and dy else CARDINAL_COST)
+                    )
+        return neighbours
+
+    def update(self, newly_explored: np.ndarray) -> None:
+        """
+        Repair the distances after the cells in `newly_explored` stopped being targets.
+        """
+        distance = self.distance
+        removed = np.argwhere(newly_explored & (distance == 0) & self.walkable)
+        if not len(removed):
+            return
+
+        # Collect every cell whose distance may have been supported by a removed target.
+        old_distance: Dict[Tuple[int, int], int] = {}
+        stack = []
+        for x, y in removed.tolist():
+            old_distance[x, y] = 0
+            stack.append((x, y))
+        while stack:
+            x, y = stack.pop()
+            for next_x, next_y, step in self._neighbours(x, y):
+                if (next_x, next_y) in old_distance:
+                    continue
+                next_distance = int(distance[next_x, next_y])
+                if next_distance and next_distance == old_distance[x, y] + step:
+                    old_distance[next_x, next_y] = next_distance
+                    stack.append((next_x, next_y))
+
+        for x, y in old_distance:
+            distance[x, y] = self.unreachable
+
+        # Reseed the invalidated area from its border and run Dijkstra inside it.
+        open_list = []
+        for x, y in old_distance:
+            best = self.unreachable
+            for next_x, next_y, step in self._neighbours(x, y):
+                next_distance = int(distance[next_x, next_y])
+                if next_distance != self.unreachable and next_distance + step < best:
+                    best = next_distance + step
+            if best != self.unreachable:
+                heapq.heappush(open_list, (best, x, y))
+
+        while open_list:
+            cell_distance, x, y = heapq.heappop(open_list)
+            if cell_distance >= distance[x, y]:
+                continue
+            distance[x, y] = cell_distance
+            for next_x, next_y, step in self._neighbours(x, y):
+                if cell_distance + step < distance[next_x, next_y]:
+                    heapq.heappush(open_list, (cell_distance + step, next_x, next_y))
+
+    def step_from(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """
+        Return the direction of the downhill step from x, y, or None if no target is reachable.
+        """
+        best = int(self.distance[x, y])
+        if best == self.unreachable:
+            return None
+        direction = None
+        for next_x, next_y, _ in self._neighbours(x, y):
+            next_distance = int(self.distance[next_x, next_y])
+            if next_distance < best:
+                best = next_distance
+                direction = next_x - x, next_y - y
+        return direction
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 import random
-from typing import Iterator, Tuple
-from typing import Iterator, List, Tuple, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
+import numpy as np
 import tcod
 
+from components.ai import Pack
 import entity_factories
 from game_map import GameMap
 import tile_types
 
 if TYPE_CHECKING:
     from engine import Engine
+    from entity import Actor
 
 class RectangularRoom:
     def __init__(self, x: int, y: int, width: int, height: int) -> None:
@@ -45,6 +47,131 @@ class RectangularRoom:
             and self.y2 >= other.y1
         )
     
+class RoomPlacer:
+    """
+    Tracks the cells taken by rooms, so that a candidate room can be tested in O(1).
+
+    A room takes every cell from (x1, y1) to (x2, y2) inclusive, the same cells
+    `RectangularRoom.intersects` tests. Candidates are first tested against a summed-area
+    table of the taken cells. Rebuilding the table costs O(width * height), so it is allowed
+    to go stale: a candidate the table passes while rooms have been added since the last
+    rebuild is checked against the taken cells directly, and the table is only rebuilt once
+    those direct checks have cost about as much as a rebuild.
+
+    For `random_fitting_position` the positions where a room of each size fits are kept as
+    well, once that size has been asked for. Adding a room only clears the positions in the
+    window around it.
+    """
+    def __init__(self, width: int, height: int) -> None:
+        self.taken = np.zeros((width, height), dtype=bool)
+        # table[x, y] is the number of taken cells in taken[:x, :y].
+        self.table = np.zeros((width + 1, height + 1), dtype=np.int32)
+        self.stale = False
+        self.direct_checks = 0
+        # A direct check costs roughly as much as rebuilding this many cells of the table.
+        self.rebuild_after = max(1, width * height // 512)
+        # For each (room_width + 1, room_height + 1) asked for, fits[x, y] is True where the
+        # room fits with its top left corner at x, y, and counts[x] is the number of those
+        # positions with that x.
+        self.fits: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def is_free(self, room: RectangularRoom) -> bool:
+        """
+        Return True if room doesn't intersect any room added so far.
+        """
+        table = self.table
+        x1, y1, x2, y2 = room.x1, room.y1, room.x2 + 1, room.y2 + 1
+        if table[x2, y2] - table[x1, y2] - table[x2, y1] + table[x1, y1]:
+            return False
+        if not self.stale:
+            return True
+        self.direct_checks += 1
+        if self.direct_checks >= self.rebuild_after:
+            self.rebuild()
+        return not self.taken[x1:x2, y1:y2].any()
+
+    def add(self, room: RectangularRoom) -> None:
+        self.taken[room.x1 : room.x2 + 1, room.y1 : room.y2 + 1] = True
+        self.stale = True
+        for (w, h), (fits, counts) in self.fits.items():
+            # The corners of the w by h windows which overlap room.
+            xs = slice(max(0, room.x1 - w + 1), room.x2 + 1)
+            window = fits[xs, max(0, room.y1 - h + 1) : room.y2 + 1]
+            counts[xs] -= window.sum(axis=1)
+            window[...] = False
+
+    def rebuild(self) -> None:
+        np.cumsum(self.taken, axis=0, dtype=np.int32, out=self.table[1:, 1:])
+        np.cumsum(self.table[1:, 1:], axis=1, out=self.table[1:, 1:])
+        self.stale = False
+        self.direct_checks = 0
+
+    def random_fitting_position(
+        self, room_width: int, room_height: int, rng: random.Random
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Return a random position where a room of this size fits, or None if there isn't one.
+
+        Positions are drawn from the same range `carve_random_rooms` draws from, using rng.
+        The first call for a size costs O(width * height), later ones O(width + height).
+        """
+        w, h = room_width + 1, room_height + 1
+        if (w, h) not in self.fits:
+            if self.stale:
+                self.rebuild()
+            table = self.table
+            width, height = self.taken.shape
+            # Windows of (room_width + 1, room_height + 1) cells, for every top left corner x
+            # in [0, width - room_width - 1] and y in [0, height - room_height - 1].
+            taken = (
+                table[w:, h:] - table[: width + 1 - w, h:]
+                - table[w:, : height + 1 - h] + table[: width + 1 - w, : height + 1 - h]
+            )
+            fits = taken == 0
+            self.fits[w, h] = fits, fits.sum(axis=1)
+        fits, counts = self.fits[w, h]
+        total = int(counts.sum())
+        if not total:
+            return None
+        # The index-th fitting position in row-major order.
+        index = rng.randrange(total)
+        cumulative = np.cumsum(counts)
+        x = int(np.searchsorted(cumulative, index, side="right"))
+        if x:
+            index -= int(cumulative[x - 1])
+        y = int(np.flatnonzero(fits[x])[index])
+        return x, y
+
+# Bump whenever a change to generation gives a different map for the same seed and
+# parameters, so that maps cached by `map_cache.MapCache` are regenerated.
+GENERATOR_VERSION = 1
+
+# Layouts `generate_dungeon` can make.
+ROOMS = "rooms"  # Rooms at random positions, those which overlap another are rejected.
+BSP = "bsp"  # One room in each leaf of a binary space partition, see `carve_bsp`.
+CAVES = "caves"  # A cellular automaton cave, see `carve_caves`.
+
+def carve_layout(
+        tiles: np.ndarray,
+        max_rooms: int,
+        room_min_size: int,
+        room_max_size: int,
+        rng: random.Random,
+        fit_rooms: bool = False,
+        generator: str = ROOMS,
+        floor: Any = tile_types.floor,
+    ) -> List[RectangularRoom]:
+    """
+    Carve the layout `generator` makes into tiles and return its rooms, see `generate_dungeon`.
+    """
+    if generator == BSP:
+        return carve_bsp(tiles, room_min_size, room_max_size, rng, floor)
+    if generator == CAVES:
+        return carve_caves(tiles, room_max_size + 1, rng, floor)
+    return carve_random_rooms(
+        tiles, max_rooms, room_min_size, room_max_size, rng, fit_rooms, floor
+    )
+
 def generate_dungeon(
         max_rooms: int,
         room_min_size: int,
@@ -54,89 +181,386 @@ def generate_dungeon(
         max_monsters_per_room: int,
         max_items_per_room: int,
         engine: Engine,
+        packs: bool = False,
+        fit_rooms: bool = False,
+        generator: str = ROOMS,
+        rng: Optional[random.Random] = None,
+        spawn_rng: Optional[random.Random] = None,
     ) -> GameMap:
     """
-    Generate a new dungeon map.
+    Generate a new dungeon map, its rooms are kept in `GameMap.rooms`.
+
+    The layout is drawn from rng and the monsters and items from spawn_rng, by default the
+    engine's map generation and spawn streams. Keeping them apart means the same layout
+    comes from the same rng state whatever is spawned in it.
+
+    If `packs` is True the monsters in each room form a `components.ai.Pack`.
+
+    `generator` is ROOMS, BSP or CAVES. With ROOMS each of the `max_rooms` attempts draws a random
+    position for a room and gives up if the room doesn't fit. If `fit_rooms` is True each
+    attempt picks only from the positions where the room fits, so far fewer attempts fail,
+    but every attempt costs O(width * height). BSP and CAVES fill the whole map whatever its
+    size and ignore `max_rooms` and `fit_rooms`, CAVES sizes its sectors from room_max_size.
     """
+    if rng is None:
+        rng = engine.rng.map_generation
+    if spawn_rng is None:
+        spawn_rng = engine.rng.spawns
     player = engine.player
     dungeon = GameMap(engine, map_width, map_height, entities=[player])
 
+    rooms = carve_layout(
+        dungeon.tiles, max_rooms, room_min_size, room_max_size, rng, fit_rooms, generator
+    )
+
+    # Cells taken by an entity, shared by every room so each can be placed in bulk.
+    occupied = np.zeros((map_width, map_height), dtype=bool)
+    if rooms:
+        player.place(*rooms[0].center, dungeon)
+        occupied[player.x, player.y] = True
+    for room in rooms:
+        place_entities(
+            room, dungeon, max_monsters_per_room, max_items_per_room, spawn_rng, packs, occupied
+        )
+
+    if rooms:
+        dungeon.downstairs_location = rooms[-1].center
+        dungeon.tiles[dungeon.downstairs_location] = tile_types.down_stairs
+    dungeon.rooms = rooms
+    dungeon.build_pathfinding()
+
+    return dungeon
+
+def carve_random_rooms(
+    tiles: np.ndarray,
+    max_rooms: int,
+    room_min_size: int,
+    room_max_size: int,
+    rng: random.Random,
+    fit_rooms: bool = False,
+    floor: Any = tile_types.floor,
+) -> List[RectangularRoom]:
+    """
+    Carve rooms at random positions into tiles, each joined to the one before by a tunnel,
+    and return them. See `generate_dungeon`.
+
+    floor is the value written for floor, so this also works on compact arrays such as the
+    `tile_types.palette` indices.
+    """
+    map_width, map_height = tiles.shape
     rooms: List[RectangularRoom] = []
+    placer = RoomPlacer(map_width, map_height)
 
     for r in range(max_rooms):
-        room_width = random.randint(room_min_size, room_max_size)
-        room_height = random.randint(room_min_size, room_max_size)
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
 
-        x = random.randint(0, dungeon.width - room_width - 1)
-        y = random.randint(0, dungeon.height - room_height - 1)
+        if fit_rooms:
+            position = placer.random_fitting_position(room_width, room_height, rng)
+            if position is None:
+                continue # Nowhere left for a room this size.
+            x, y = position
+        else:
+            x = rng.randint(0, map_width - room_width - 1)
+            y = rng.randint(0, map_height - room_height - 1)
 
         # "RectangluarRoom" class makes it easier to work with
         new_room = RectangularRoom(x, y, room_width, room_height)
 
-        if any(new_room.intersects(other_room) for other_room in rooms):
+        if not placer.is_free(new_room):
             continue # Room intersets so make another attempt
+        placer.add(new_room)
 
-        dungeon.tiles[new_room.inner] = tile_types.floor
+        tiles[new_room.inner] = floor
 
-        if len(rooms) == 0:
-            player.place(*new_room.center, dungeon)
-        else:
-            for x, y in tunnel_between(rooms[-1].center, new_room.center):
-                dungeon.tiles[x, y] = tile_types.floor
-        
-        place_entities(new_room, dungeon, max_monsters_per_room, max_monsters_per_room)
+        if rooms:
+            carve_tunnel(tiles, rooms[-1].center, new_room.center, rng, floor)
         rooms.append(new_room)
 
-    return dungeon
+    return rooms
+
+def carve_bsp(
+    tiles: np.ndarray,
+    room_min_size: int,
+    room_max_size: int,
+    rng: random.Random,
+    floor: Any = tile_types.floor,
+) -> List[RectangularRoom]:
+    """
+    Carve a room into each leaf of a binary space partition of tiles and return the rooms.
+
+    The map is split with `tcod.bsp` until no leaf can be split into two that each hold the
+    largest room. Going up the tree, a room from each half of a node is joined to a room
+    from the other half by a tunnel, so every room is reachable. Rooms and tunnels are
+    carved with slice assignments, there are no loops over cells.
+
+    floor is the value written for floor, as for `carve_random_rooms`.
+    """
+    map_width, map_height = tiles.shape
+    # A room of size n takes n + 1 cells, its walls included.
+    leaf_size = room_max_size + 1
+    bsp = tcod.bsp.BSP(x=0, y=0, width=map_width, height=map_height)
+    bsp.split_recursive(
+        depth=2 * max(map_width, map_height).bit_length(),
+        min_width=leaf_size,
+        min_height=leaf_size,
+        max_horizontal_ratio=1.5,
+        max_vertical_ratio=1.5,
+        seed=tcod.random.Random(tcod.random.MERSENNE_TWISTER, seed=rng.getrandbits(31)),
+    )
+
+    rooms: List[RectangularRoom] = []
+    # A room in each node's subtree, the one its tunnel to the sibling subtree starts from.
+    connects: Dict[tcod.bsp.BSP, RectangularRoom] = {}
+    for node in bsp.post_order():
+        if node.children:
+            first, second = (connects.pop(child) for child in node.children)
+            carve_tunnel(tiles, first.center, second.center, rng, floor)
+            connects[node] = first if rng.random() < 0.5 else second
+            continue
+        if node.width <= room_min_size or node.height <= room_min_size:
+            continue  # Only happens when the whole map is smaller than a room.
+        room_width = rng.randint(room_min_size, min(room_max_size, node.width - 1))
+        room_height = rng.randint(room_min_size, min(room_max_size, node.height - 1))
+        x = node.x + rng.randint(0, node.width - room_width - 1)
+        y = node.y + rng.randint(0, node.height - room_height - 1)
+        room = RectangularRoom(x, y, room_width, room_height)
+        tiles[room.inner] = floor
+        rooms.append(room)
+        connects[node] = room
+
+    return rooms
+
+def carve_caves(
+    tiles: np.ndarray,
+    sector_size: int,
+    rng: random.Random,
+    floor: Any = tile_types.floor,
+    wall_chance: float = 0.45,
+    smoothing_steps: int = 4,
+) -> List[RectangularRoom]:
+    """
+    Carve a cave into tiles with a cellular automaton and return pseudo-rooms for spawning.
+
+    Each cell starts as wall with `wall_chance`, then each smoothing step makes every cell a
+    wall if at least 5 cells of the 3x3 block around it are walls, and floor otherwise. Only
+    the largest connected region of floor is kept. Each step is a few whole-array
+    operations, see `wall_counts` and `largest_region`.
+
+    The cave has no rooms, so it is cut into sectors of `sector_size` cells square. Each
+    sector whose center is floor is returned as a room centered on it, so `place_entities`
+    can spawn into it and the player and stairs go to floor. Rooms are in raster order, so
+    the first and last are at opposite ends of the map.
+    """
+    width, height = tiles.shape
+    noise = np.random.default_rng(rng.getrandbits(64))
+    walls = noise.random((width, height)) < wall_chance
+    for _ in range(smoothing_steps):
+        walls = wall_counts(walls) >= 5
+        walls[[0, -1], :] = True
+        walls[:, [0, -1]] = True
+
+    cave = largest_region(~walls)
+    tiles[cave] = floor
+
+    half = sector_size // 2
+    centers_x = np.arange(half, width - half, sector_size)
+    centers_y = np.arange(half, height - half, sector_size)
+    centers = np.argwhere(cave[np.ix_(centers_x, centers_y)])
+    rooms = [
+        RectangularRoom(x - half, y - half, 2 * half, 2 * half)
+        for x, y in zip(centers_x[centers[:, 0]].tolist(), centers_y[centers[:, 1]].tolist())
+    ]
+    if not rooms and cave.any():
+        # No sector is centered on floor, fall back on a room around any floor cell.
+        x, y = np.argwhere(cave)[0].tolist()
+        rooms = [RectangularRoom(x - 1, y - 1, 2, 2)]
+    return rooms
+
+def wall_counts(walls: np.ndarray) -> np.ndarray:
+    """
+    Return the number of walls in the 3x3 block around each cell, counting the cells past
+    the edges as walls.
+    """
+    padded = np.pad(walls, 1, constant_values=True).view(np.uint8)
+    columns = padded[:-2] + padded[1:-1] + padded[2:]
+    return columns[:, :-2] + columns[:, 1:-1] + columns[:, 2:]
+
+def largest_region(open_cells: np.ndarray) -> np.ndarray:
+    """
+    Return a mask of the largest region of open cells connected through their 8 neighbours.
+
+    Rather than flood filling cell by cell, the open cells are split into vertical runs,
+    runs in neighbouring columns which touch are linked, and the links are merged with
+    vectorized union-find, hooking each component onto the lowest run it touches and then
+    pointer jumping until every run points at its component's root.
+    """
+    width, height = open_cells.shape
+    # A closed cell at the end of each column stops runs from wrapping round to the next.
+    stride = height + 1
+    flat = np.zeros(width * stride + 1, dtype=np.int8)
+    flat[:-1].reshape(width, stride)[:, :height] = open_cells
+    edges = np.diff(flat, prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)  # Exclusive.
+    if not len(starts):
+        return np.zeros_like(open_cells, dtype=bool)
+
+    # The runs in the previous column which touch each run, diagonals included, are a
+    # contiguous range since runs are sorted and don't overlap.
+    first = np.searchsorted(ends, starts - stride, side="left")
+    last = np.searchsorted(starts, ends - stride, side="right")
+    counts = np.maximum(last - first, 0)
+    run = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.repeat(first - (np.cumsum(counts) - counts), counts)
+    touching = np.arange(len(run)) + offsets
+
+    parent = np.arange(len(starts))
+    while len(run):
+        root_a, root_b = parent[run], parent[touching]
+        linked = root_a != root_b
+        run, touching = run[linked], touching[linked]
+        root_a, root_b = root_a[linked], root_b[linked]
+        if not len(run):
+            break
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    sizes = np.bincount(parent, weights=ends - starts)
+    keep = parent == np.argmax(sizes)
+    marks = np.zeros(width * stride + 1, dtype=np.int8)
+    marks[starts[keep]] = 1
+    marks[ends[keep]] = -1
+    return (np.cumsum(marks[:-1]) > 0).reshape(width, stride)[:, :height]
+
+def carve_line(
+    tiles: np.ndarray, start: Tuple[int, int], end: Tuple[int, int], floor: Any = tile_types.floor
+) -> None:
+    """
+    Set every tile on the line from start to end, inclusive, to floor.
+
+    Horizontal and vertical lines are written as one slice, anything else as one fancy-index
+    assignment of the Bresenham line.
+    """
+    x1, y1 = start
+    x2, y2 = end
+    if y1 == y2:
+        tiles[min(x1, x2) : max(x1, x2) + 1, y1] = floor
+    elif x1 == x2:
+        tiles[x1, min(y1, y2) : max(y1, y2) + 1] = floor
+    else:
+        tiles[tuple(tcod.los.bresenham(start, end).T)] = floor
 
-def tunnel_between(start: Tuple[int, int], end: Tuple[int, int]) -> Iterator[Tuple[int, int]]:
+def carve_tunnel(
+    tiles: np.ndarray,
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    rng: random.Random,
+    floor: Any = tile_types.floor,
+) -> None:
     """
-    Return an L-shaped tunnel between these two points
+    Carve an L-shaped tunnel from start to end, turning at a corner chosen by rng, with
+    two slice assignments.
     """
     x1, y1 = start
     x2, y2 = end
-    if random.random() < 0.5: # 50% chance.
+    if rng.random() < 0.5: # 50% chance.
         corner_x, corner_y = x2, y1 # Move horizontally, then vertically.
     else:
         corner_x, corner_y = x1, y2 # Move vertically, then horizontally.
-    
-    for x, y in tcod.los.bresenham((x1, y1), (corner_x, corner_y)).tolist():
-        yield x, y
 
-    for x, y in tcod.los.bresenham((corner_x, corner_y), (x2, y2)).tolist():
-        yield x, y
+    carve_line(tiles, (x1, y1), (corner_x, corner_y), floor)
+    carve_line(tiles, (corner_x, corner_y), (x2, y2), floor)
+
+def choose_spawns(
+    room: RectangularRoom,
+    walkable: np.ndarray,
+    occupied: np.ndarray,
+    maximum_monsters: int,
+    maximum_items: int,
+    rng: random.Random,
+) -> Tuple[List[Tuple[str, int, int]], List[Tuple[str, int, int]]]:
+    """
+    Choose up to `maximum_monsters` monsters and `maximum_items` items inside room, without
+    spawning them. Returns the `entity_factories.spawnable` name and position of each
+    monster and of each item.
+
+    Positions are sampled without replacement from the flat indices of the room's walkable
+    cells which aren't occupied, so each spawn is O(1) and as many entities are chosen as
+    were drawn unless the room runs out of cells. occupied marks the cells already taken on
+    the whole map and is updated.
+    """
+    number_of_monsters = rng.randint(0, maximum_monsters)
+    number_of_items = rng.randint(0, maximum_items)
+
+    inner_x, inner_y = room.inner
+    free = walkable[room.inner] & ~occupied[room.inner]
+    cells = np.flatnonzero(free)
+    count = min(number_of_monsters + number_of_items, len(cells))
+    if not count:
+        return [], []
+    chosen = cells[rng.sample(range(len(cells)), count)]
+    xs, ys = np.divmod(chosen, free.shape[1])
+    xs += inner_x.start
+    ys += inner_y.start
+    occupied[xs, ys] = True
+    positions = list(zip(xs.tolist(), ys.tolist()))
+
+    monsters = []
+    for x, y in positions[:number_of_monsters]:
+        if rng.random() < 0.8:
+            monsters.append(("orc", x, y))
+        else:
+            monsters.append(("troll", x, y))
+
+    items = []
+    for x, y in positions[number_of_monsters:]:
+        item_chance = rng.random()
+
+        if item_chance < 0.7:
+            items.append(("health_potion", x, y))
+        elif item_chance < 0.8:
+            items.append(("fireball_scroll", x, y))
+        elif item_chance < 0.9:
+            items.append(("confusion_scroll", x, y))
+        else:
+            items.append(("lightning_scroll", x, y))
+
+    return monsters, items
 
 def place_entities(
     room: RectangularRoom,
     dungeon: GameMap,
     maximum_monsters: int,
     maximum_items: int,
+    rng: random.Random,
+    packs: bool = False,
+    occupied: Optional[np.ndarray] = None,
 ) -> None:
-    number_of_monsters = random.randint(0, maximum_monsters)
-    number_of_items = random.randint(0, maximum_items)
-
-    for i in range(number_of_monsters):
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
-
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
-            if random.random() < 0.8:
-                entity_factories.orc.spawn(dungeon, x, y)
-            else:
-                entity_factories.troll.spawn(dungeon, x, y)
-
-    for i in range(number_of_items):
-        x = random.randint(room.x1 + 1, room.x2 -1)
-        y = random.randint(room.y1 + 1, room.y2 -1)
-
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
-            item_chance = random.random()
-
-            if item_chance < 0.7:
-                entity_factories.health_potion.spawn(dungeon, x, y)
-            elif item_chance < 0.8:
-                entity_factories.fireball_scroll.spawn(dungeon, x, y)
-            elif item_chance < 0.9:
-                entity_factories.confusion_scroll.spawn(dungeon, x, y)
-            else:
-                entity_factories.lightning_scroll.spawn(dungeon, x, y)
\ No newline at end of file
+    """
+    Spawn up to `maximum_monsters` monsters and `maximum_items` items inside room, at the
+    positions `choose_spawns` picks.
+
+    occupied marks the cells already taken on the whole map and is updated, if it isn't
+    given it is built from `dungeon.entities`.
+    """
+    if occupied is None:
+        occupied = np.zeros((dungeon.width, dungeon.height), dtype=bool)
+        for entity in dungeon.entities:
+            occupied[entity.x, entity.y] = True
+
+    monsters, items = choose_spawns(
+        room, dungeon.walkable, occupied, maximum_monsters, maximum_items, rng
+    )
+    spawnable = entity_factories.spawnable
+    actors: List[Actor] = [spawnable[name].spawn(dungeon, x, y) for name, x, y in monsters]
+
+    if packs and len(actors) > 1:
+        Pack(actors)
+
+    for name, x, y in items:
+        spawnable[name].spawn(dungeon, x, y)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Tuple, TYPE_CHECKING
 
 import color
 
@@ -56,6 +56,14 @@ def render_bar(
         fg=color.bar_text
     )
 
+def render_dungeon_level(console: Console, dungeon_level: int, location: Tuple[int, int]) -> None:
+    """
+    Render the level the player is currently on, at the given location.
+    """
+    x, y = location
+
+    console.print(x=x, y=y, string=f"Dungeon level: {dungeon_level}")
+
 def render_names_at_mouse_location(
         console: Console,
         x: int,
@@ -72,3 +80,19 @@ def render_names_at_mouse_location(
 
     console.print(x=x, y=y, string=names_at_mouse_location)
 
+
+def render_hover_path(console: Console, engine: Engine) -> None:
+    """
+    Highlight the route from the player to the cell under the mouse.
+
+    The route is traced on the player distance map, which is only rebuilt once per turn,
+    so moving the mouse never starts a new search.
+    """
+    mouse_x, mouse_y = engine.mouse_location
+    if not engine.game_map.in_bounds(mouse_x, mouse_y) or not engine.game_map.explored[mouse_x, mouse_y]:
+        return
+
+    path = engine.player_path_to(mouse_x, mouse_y)
+    if path:
+        path_x, path_y = zip(*path)
+        console.rgb["bg"][path_x, path_y] = color.hover_path
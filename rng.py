@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from typing import Dict, Optional
+
+# Names of the streams used by the game.
+MAP_GENERATION = "map_generation"
+SPAWNS = "spawns"
+AI = "ai"
+COMBAT = "combat"
+
+def derive_seed(seed: int, name: str) -> int:
+    """
+    Return a 64 bit seed for `name` derived from `seed`, the same on every platform and run.
+    """
+    digest = hashlib.sha256(f"{seed}/{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+class RNGStreams:
+    """
+    Independent random number streams derived from one master seed.
+
+    Each named stream is a separate `random.Random`, so drawing more numbers from one, such
+    as the AI, never changes what another, such as map generation, produces. The same seed
+    always gives the same streams, which makes generated maps reproducible and cacheable by
+    (seed, parameters). Parallel workers are given a seed from `derive_seed`, such as one
+    per dungeon floor, and build streams of their own from it.
+    """
+    def __init__(self, seed: Optional[int] = None) -> None:
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self._streams: Dict[str, random.Random] = {}
+
+    def stream(self, name: str) -> random.Random:
+        """
+        Returns the stream called `name`, created on first use.
+        """
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = random.Random(derive_seed(self.seed, name))
+        return stream
+
+    @property
+    def map_generation(self) -> random.Random:
+        return self.stream(MAP_GENERATION)
+
+    @property
+    def spawns(self) -> random.Random:
+        return self.stream(SPAWNS)
+
+    @property
+    def ai(self) -> random.Random:
+        return self.stream(AI)
+
+    @property
+    def combat(self) -> random.Random:
+        return self.stream(COMBAT)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+# An actor with NORMAL_SPEED waits exactly the cost of its action before acting again.
+NORMAL_SPEED = 100
+# The cost of an ordinary action, such as a step or an attack.
+NORMAL_COST = 100
+
+class TurnScheduler:
+    """
+    Priority queue of actors keyed by the time of their next action.
+
+    After acting an actor is rescheduled `cost * NORMAL_SPEED / speed` time units later,
+    so fast actors act more often and expensive actions take longer. Actors due at the
+    same time act in the order they were scheduled, which keeps the order deterministic.
+
+    Only actors that are due are ever popped, the cost of a tick is proportional to the
+    number of actions taken rather than the number of actors scheduled.
+    """
+    def __init__(self) -> None:
+        self.time = 0
+        self.queue: List[Tuple[int, int, Actor]] = []
+        self._order = itertools.count()
+        # Number of actions popped since the last call to `begin_tick`.
+        self.actions_per_tick = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of entries waiting in the queue, including ones for actors which have died.
+        """
+        return len(self.queue)
+
+    @staticmethod
+    def delay(actor: Actor, cost: int) -> int:
+        """
+        Return how long `actor` waits after an action costing `cost`.
+        """
+        return max(1, cost * NORMAL_SPEED // actor.speed)
+
+    def schedule(self, actor: Actor, delay: int = 0) -> None:
+        """
+        Schedule `actor` to act `delay` time units from now.
+        """
+        self.schedule_at(actor, self.time + delay)
+
+    def schedule_at(self, actor: Actor, time: int) -> None:
+        """
+        Schedule `actor` to act at `time`.
+        """
+        heapq.heappush(self.queue, (time, next(self._order), actor))
+
+    def begin_tick(self) -> None:
+        self.actions_per_tick = 0
+
+    def pop_due(self, until: int) -> List[Tuple[int, Actor]]:
+        """
+        Pop every live actor due to act before `until`, in order, with the time it is due.
+
+        The caller is responsible for rescheduling every actor it is given, actors which
+        are rescheduled before `until` are returned by the next call. Dead actors are
+        dropped from the queue.
+        """
+        due = []
+        queue = self.queue
+        while queue and queue[0][0] < until:
+            time, _, actor = heapq.heappop(queue)
+            if actor.is_alive:
+                due.append((time, actor))
+        self.actions_per_tick += len(due)
+        return due
+
+    def end_tick(self, until: int) -> None:
+        """
+        Move the clock to `until` once every actor due before it has acted.
+        """
+        self.time = until
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Any, List, NamedTuple, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Actor
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel of items keyed by the turn they are due.
+
+    Level 0 has a slot for each of the next `2 ** slot_bits` turns, each level above
+    covers `2 ** slot_bits` times the span of the one below. Items far in the future sit
+    in a coarse slot and are moved down a level each time the wheel below wraps round, so
+    scheduling is O(1) and advancing a turn only looks at the items that are due.
+    """
+    def __init__(self, slot_bits: int = 6, levels: int = 4, now: int = 0) -> None:
+        self.slot_bits = slot_bits
+        self.mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.wheels: List[List[List[Tuple[int, Any]]]] = [
+            [[] for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        # Items beyond the span of the top level.
+        self.overflow: List[Tuple[int, Any]] = []
+        self.now = now
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def schedule(self, item: Any, at: int) -> None:
+        """
+        Schedule item to be returned by `advance` on turn `at`, or on the next turn if `at`
+        has already passed.
+        """
+        self._insert(max(at, self.now + 1), item)
+        self.count += 1
+
+    def _insert(self, at: int, item: Any) -> None:
+        delta = at - self.now
+        for level in range(self.levels):
+            if delta < 1 << (self.slot_bits * (level + 1)):
+                slot = (at >> (self.slot_bits * level)) & self.mask
+                self.wheels[level][slot].append((at, item))
+                return
+        self.overflow.append((at, item))
+
+    def advance(self, to: int) -> List[Any]:
+        """
+        Move the wheel forward to turn `to` and return every item due by then, earliest first.
+        """
+        fired: List[Any] = []
+        slot_bits = self.slot_bits
+        mask = self.mask
+        while self.now < to:
+            self.now += 1
+            now = self.now
+            # Cascade from the top, each level wraps round only when every level below has.
+            if now & ((1 << (slot_bits * self.levels)) - 1) == 0:
+                overflow, self.overflow = self.overflow, []
+                for at, item in overflow:
+                    self._insert(at, item)
+            for level in range(self.levels - 1, 0, -1):
+                if now & ((1 << (slot_bits * level)) - 1) == 0:
+                    wheel = self.wheels[level]
+                    slot = (now >> (slot_bits * level)) & mask
+                    entries, wheel[slot] = wheel[slot], []
+                    for at, item in entries:
+                        self._insert(at, item)
+            wheel = self.wheels[0]
+            slot = now & mask
+            if wheel[slot]:
+                fired.extend(item for _, item in wheel[slot])
+                self.count -= len(wheel[slot])
+                wheel[slot] = []
+        return fired
+
+# How applying an effect which is already active combines with it:
+REFRESH = "refresh"  # The duration restarts, if that is longer than what remains.
+STACK = "stack"  # As refresh, and adds a stack up to `max_stacks`.
+EXTEND = "extend"  # The new duration is added to what remains.
+
+class EffectType(NamedTuple):
+    name: str
+    stacking: str = REFRESH
+    max_stacks: int = 1
+    # Shown when the effect wears off, formatted with the actor's name.
+    expire_message: str = ""
+
+CONFUSED = EffectType("confused", expire_message="The {name} is no longer confused.")
+
+class StatusEffect:
+    """
+    An effect active on one actor, found in `Actor.effects` under its type's name.
+    """
+    def __init__(self, effect_type: EffectType, target: Actor, expires_at: int) -> None:
+        self.type = effect_type
+        self.target = target
+        self.expires_at = expires_at
+        self.stacks = 1
+
+class StatusEffects:
+    """
+    Keeps track of when every active status effect expires.
+
+    Effects are data on the actor, nothing runs for them on turns where they don't expire.
+    Each effect has a single entry in the timer wheel. Extending an effect only changes its
+    `expires_at`, when the old entry comes due the effect is put back in the wheel instead of
+    expiring.
+    """
+    def __init__(self) -> None:
+        self.wheel = TimerWheel()
+        self.active_count = 0
+
+    def apply(self, target: Actor, effect_type: EffectType, duration: int, now: int) -> StatusEffect:
+        """
+        Apply an effect to target for the next `duration` turns, `now` is the current turn.
+        """
+        expires_at = now + duration + 1
+        effect = target.effects.get(effect_type.name)
+        if effect is None:
+            effect = StatusEffect(effect_type, target, expires_at)
+            target.effects[effect_type.name] = effect
+            self.wheel.schedule(effect, expires_at)
+            self.active_count += 1
+        elif effect_type.stacking == EXTEND:
+            effect.expires_at += duration
+        else:
+            effect.expires_at = max(effect.expires_at, expires_at)
+            if effect_type.stacking == STACK:
+                effect.stacks = min(effect.stacks + 1, effect_type.max_stacks)
+        return effect
+
+    def remove(self, target: Actor, effect_type: EffectType) -> None:
+        """
+        End an effect early, its wheel entry is dropped when it comes due.
+        """
+        if target.effects.pop(effect_type.name, None) is not None:
+            self.active_count -= 1
+
+    def clear(self, target: Actor) -> None:
+        """
+        End every effect on target, such as when it dies.
+        """
+        self.active_count -= len(target.effects)
+        target.effects.clear()
+
+    def advance(self, now: int) -> List[StatusEffect]:
+        """
+        Move time forward to `now` and return the effects which have expired.
+        """
+        expired = []
+        for effect in self.wheel.advance(now):
+            if effect.target.effects.get(effect.type.name) is not effect:
+                continue  # Removed early.
+            if effect.expires_at > now:
+                self.wheel.schedule(effect, effect.expires_at)
+                continue
+            del effect.target.effects[effect.type.name]
+            expired.append(effect)
+        self.active_count -= len(expired)
+        return expired
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from dataset import LevelDataset, generate_dataset
+from procgen import BSP, CAVES, ROOMS
+from world import FloorParameters, generate_floor
+
+@pytest.mark.parametrize("generator", [ROOMS, BSP, CAVES])
+def test_levels_match_generate_floor(tmp_path, generator):
+    parameters = FloorParameters(generator=generator, packs=True, max_monsters_per_room=3)
+    seeds = list(range(100, 112))
+    path = str(tmp_path / "levels.dat")
+    generate_dataset(path, seeds, parameters, depth=4, workers=2, chunk_size=5)
+
+    dataset = LevelDataset(path)
+    assert len(dataset) == len(seeds)
+    assert dataset.complete
+    assert dataset.parameters == parameters
+    for number, seed in enumerate(seeds):
+        expected = generate_floor(4, seed, parameters)
+        floor = dataset.floor(number)
+        assert np.array_equal(floor.tiles, expected.tiles)
+        assert floor._replace(tiles=None) == expected._replace(tiles=None)
+        assert len(dataset.level_spawns(number)) == len(expected.spawns)
+
+def test_unwritten_levels_are_not_complete(tmp_path):
+    path = str(tmp_path / "levels.dat")
+    generate_dataset(path, [1, 2], workers=1)
+    dataset = LevelDataset(path, writable=True)
+    dataset.index["done"][1] = 0
+    assert not dataset.complete
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.dat"
+    path.write_bytes(b"\0" * 4096)
+    with pytest.raises(ValueError):
+        LevelDataset(str(path))
@@ -0,0 +1,41 @@
+import os
+
+import numpy as np
+import pytest
+
+from map_cache import MapCache, dump_floor, load_floor
+from world import FloorParameters, generate_floor
+
+PARAMETERS = FloorParameters(packs=True, max_monsters_per_room=3)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dump_load_round_trip(seed):
+    floor = generate_floor(4, seed, PARAMETERS)
+    loaded = load_floor(dump_floor(floor))
+    assert (loaded.tiles == floor.tiles).all()
+    assert loaded._replace(tiles=None) == floor._replace(tiles=None)
+
+def test_cache_hit_returns_same_floor(tmp_path):
+    cache = MapCache(str(tmp_path))
+    floor = cache.load_or_generate(1, 3, PARAMETERS)
+    cached = MapCache(str(tmp_path)).get(3, PARAMETERS)
+    assert cached is not None
+    assert np.array_equal(cached.tiles, floor.tiles)
+    assert cached.spawns == floor.spawns and cached.packs == floor.packs
+
+@pytest.mark.parametrize("size", [0, 10, 60, 3000, -5])
+def test_corrupt_file_is_a_miss(tmp_path, size):
+    cache = MapCache(str(tmp_path))
+    floor = cache.load_or_generate(1, 3, PARAMETERS)
+    path = cache.path(cache.key(3, PARAMETERS))
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:size])
+
+    cache = MapCache(str(tmp_path))
+    assert cache.get(3, PARAMETERS) is None
+    assert not os.path.exists(path)
+    assert cache.misses == 1 and cache.total_bytes == 0
+    regenerated = cache.load_or_generate(1, 3, PARAMETERS)
+    assert np.array_equal(regenerated.tiles, floor.tiles)
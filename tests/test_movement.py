@@ -0,0 +1,114 @@
+import random
+from typing import List, Set, Tuple
+
+import numpy as np
+import pytest
+
+from movement import resolve_moves
+
+def resolve(
+        walkable: np.ndarray,
+        sources: List[Tuple[int, int]],
+        destinations: List[Tuple[int, int]],
+        blockers: Set[Tuple[int, int]] = frozenset(),
+) -> List[bool]:
+    occupied = np.array(
+        [destination in blockers or destination in sources for destination in destinations],
+        dtype=bool,
+    )
+    return resolve_moves(
+        walkable,
+        occupied,
+        np.array(sources, dtype=np.intp).reshape(-1, 2),
+        np.array(destinations, dtype=np.intp).reshape(-1, 2),
+    ).tolist()
+
+def reference(
+        walkable: np.ndarray,
+        sources: List[Tuple[int, int]],
+        destinations: List[Tuple[int, int]],
+        blockers: Set[Tuple[int, int]],
+) -> List[bool]:
+    """
+    Move one mover at a time into a free cell until nobody else can, after dropping the
+    moves `resolve_moves` rules out up front.
+    """
+    width, height = walkable.shape
+    pending = []
+    claimed = set()
+    for i, (x, y) in enumerate(destinations):
+        if not (0 <= x < width and 0 <= y < height and walkable[x, y]):
+            continue
+        if (x, y) in claimed:
+            continue
+        claimed.add((x, y))
+        pending.append(i)
+    taken = set(blockers) | set(sources)
+    moved = [False] * len(sources)
+    progress = True
+    while progress:
+        progress = False
+        for i in list(pending):
+            if destinations[i] not in taken:
+                taken.discard(sources[i])
+                taken.add(destinations[i])
+                moved[i] = True
+                pending.remove(i)
+                progress = True
+    return moved
+
+@pytest.fixture
+def open_map() -> np.ndarray:
+    return np.ones((6, 6), dtype=bool)
+
+def test_swap_fails(open_map):
+    assert resolve(open_map, [(1, 1), (2, 1)], [(2, 1), (1, 1)]) == [False, False]
+
+def test_cycle_fails(open_map):
+    sources = [(1, 1), (2, 1), (2, 2), (1, 2)]
+    destinations = sources[1:] + sources[:1]
+    assert resolve(open_map, sources, destinations) == [False] * 4
+
+def test_chain_moves_together(open_map):
+    sources = [(1, 1), (2, 1), (3, 1)]
+    destinations = [(2, 1), (3, 1), (4, 1)]
+    assert resolve(open_map, sources, destinations) == [True, True, True]
+
+def test_chain_into_blocked_cell_fails(open_map):
+    sources = [(1, 1), (2, 1), (3, 1)]
+    destinations = [(2, 1), (3, 1), (4, 1)]
+    assert resolve(open_map, sources, destinations, {(4, 1)}) == [False, False, False]
+
+def test_chain_into_wall_fails(open_map):
+    open_map[4, 1] = False
+    sources = [(1, 1), (2, 1), (3, 1)]
+    destinations = [(2, 1), (3, 1), (4, 1)]
+    assert resolve(open_map, sources, destinations) == [False, False, False]
+
+def test_first_mover_takes_contested_cell(open_map):
+    sources = [(1, 1), (3, 1)]
+    destinations = [(2, 1), (2, 1)]
+    assert resolve(open_map, sources, destinations) == [True, False]
+    assert resolve(open_map, sources[::-1], destinations) == [True, False]
+
+def test_out_of_bounds_fails(open_map):
+    assert resolve(open_map, [(0, 0)], [(-1, 0)]) == [False]
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_sequential_reference(seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(2, 7), rng.randint(2, 7)
+    walkable = np.array(
+        [[rng.random() < 0.8 for _ in range(height)] for _ in range(width)], dtype=bool
+    )
+    cells = [(x, y) for x in range(width) for y in range(height)]
+    rng.shuffle(cells)
+    count = rng.randint(1, len(cells))
+    sources = cells[:count]
+    blockers = set(cells[count : count + rng.randint(0, len(cells) - count)])
+    destinations = [
+        (x + rng.randint(-1, 1), y + rng.randint(-1, 1)) for x, y in sources
+    ]
+    assert resolve(walkable, sources, destinations, blockers) == reference(
+        walkable, sources, destinations, blockers
+    )
@@ -0,0 +1,107 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+import tcod
+
+from pathfinding import CARDINAL_COST, DIAGONAL_COST, FrontierMap, JumpPointSearch, Landmarks
+
+def random_grid(rng: random.Random, wall_chance: float = 0.3) -> np.ndarray:
+    width, height = rng.randint(5, 30), rng.randint(5, 30)
+    return np.array(
+        [[rng.random() >= wall_chance for _ in range(height)] for _ in range(width)],
+        dtype=bool,
+    )
+
+def dijkstra(cost: np.ndarray, start: Tuple[int, int]) -> np.ndarray:
+    distance = tcod.path.maxarray(cost.shape, dtype=np.int32)
+    distance[start] = 0
+    tcod.path.dijkstra2d(distance, cost, CARDINAL_COST, DIAGONAL_COST, out=distance)
+    return distance
+
+def path_cost(cost: np.ndarray, start: Tuple[int, int], path: List[Tuple[int, int]]) -> int:
+    """
+    Return the cost of walking path from start, checking that every step is a move to a
+    neighbouring cell which isn't blocked.
+    """
+    total = 0
+    x, y = start
+    for next_x, next_y in path:
+        dx, dy = next_x - x, next_y - y
+        assert max(abs(dx), abs(dy)) == 1
+        assert cost[next_x, next_y]
+        total += int(cost[next_x, next_y]) * (DIAGONAL_COST if dx and dy else CARDINAL_COST)
+        x, y = next_x, next_y
+    return total
+
+def random_queries(rng: random.Random, walkable: np.ndarray, count: int):
+    cells = [tuple(cell) for cell in np.argwhere(walkable).tolist()]
+    for _ in range(count):
+        if len(cells) < 2:
+            return
+        yield tuple(rng.choice(cells)), tuple(rng.choice(cells))
+
+@pytest.mark.parametrize("seed", range(30))
+def test_jump_point_search_matches_dijkstra(seed):
+    rng = random.Random(seed)
+    walkable = random_grid(rng, rng.choice([0.0, 0.2, 0.4]))
+    cost = walkable.astype(np.int8)
+    search = JumpPointSearch(walkable)
+    for start, goal in random_queries(rng, walkable, 10):
+        expected = int(dijkstra(cost, start)[goal])
+        path = search.path_to(start, goal)
+        if start == goal or expected == np.iinfo(np.int32).max:
+            assert path == []
+            continue
+        assert path[-1] == goal
+        assert path_cost(cost, start, path) == expected
+
+@pytest.mark.parametrize("seed", range(30))
+def test_landmarks_match_dijkstra_with_extra_costs(seed):
+    rng = random.Random(seed)
+    walkable = random_grid(rng)
+    landmarks = Landmarks(walkable, count=rng.randint(1, 8))
+    cost = walkable.astype(np.int8)
+    # Raise the cost of some open cells, as blocking entities do in `BaseAI.get_path_to`.
+    raised = walkable & (np.array([[rng.random() for _ in row] for row in cost]) < 0.1)
+    cost[raised] += 10
+    for start, goal in random_queries(rng, walkable, 10):
+        expected = int(dijkstra(cost, start)[goal])
+        path = landmarks.path_to(start, goal, cost)
+        if start == goal or expected == np.iinfo(np.int32).max:
+            assert path == []
+            continue
+        assert path[-1] == goal
+        assert path_cost(cost, start, path) == expected
+
+@pytest.mark.parametrize("seed", range(10))
+def test_landmark_heuristic_is_admissible(seed):
+    rng = random.Random(seed)
+    walkable = random_grid(rng)
+    landmarks = Landmarks(walkable)
+    cost = walkable.astype(np.int8)
+    for _, goal in random_queries(rng, walkable, 5):
+        heuristic = landmarks.heuristic(goal)
+        distance = dijkstra(cost, goal)
+        for x, y in np.argwhere(distance != np.iinfo(np.int32).max).tolist():
+            assert heuristic(x, y) <= distance[x, y]
+
+@pytest.mark.parametrize("seed", range(30))
+def test_frontier_map_updates_match_rebuild(seed):
+    rng = random.Random(seed)
+    walkable = random_grid(rng, rng.choice([0.1, 0.3]))
+    explored = np.zeros(walkable.shape, dtype=bool)
+    frontier = FrontierMap(walkable, explored)
+    width, height = walkable.shape
+    while not explored.all():
+        # Explore a small square, as the player's view does.
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randint(0, 3)
+        newly_explored = np.zeros(walkable.shape, dtype=bool)
+        square = slice(max(0, x - radius), x + radius + 1), slice(max(0, y - radius), y + radius + 1)
+        newly_explored[square] = True
+        newly_explored &= ~explored
+        explored |= newly_explored
+        frontier.update(newly_explored)
+        assert (frontier.distance == FrontierMap(walkable, explored).distance).all()
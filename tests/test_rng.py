@@ -0,0 +1,27 @@
+from rng import RNGStreams, derive_seed
+
+def test_derive_seed_is_stable():
+    # Pinned, so that a change to the derivation, which would change every seeded floor and
+    # invalidate every cached one, is noticed.
+    assert derive_seed(0, "map_generation") == 17184808763347828310
+    assert derive_seed(12345, "floor 3") == 9744999711247235835
+
+def test_derive_seed_separates_names_and_seeds():
+    seeds = {derive_seed(seed, f"floor {depth}") for seed in range(20) for depth in range(20)}
+    assert len(seeds) == 400
+    assert all(0 <= seed < 2 ** 64 for seed in seeds)
+
+def test_same_seed_gives_same_streams():
+    first, second = RNGStreams(7), RNGStreams(7)
+    for name in ("map_generation", "spawns", "ai", "combat"):
+        assert [first.stream(name).random() for _ in range(5)] == [
+            second.stream(name).random() for _ in range(5)
+        ]
+
+def test_streams_are_independent():
+    quiet, busy = RNGStreams(7), RNGStreams(7)
+    for _ in range(100):
+        busy.ai.random()
+    assert [quiet.map_generation.random() for _ in range(5)] == [
+        busy.map_generation.random() for _ in range(5)
+    ]
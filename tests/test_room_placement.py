@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+from procgen import RectangularRoom, RoomPlacer
+
+def fitting_positions(rooms, width, height, room_width, room_height):
+    """
+    Every top left corner, in row-major order, where a room of this size is in the range
+    `carve_random_rooms` draws from and doesn't intersect any of rooms.
+    """
+    return [
+        (x, y)
+        for x in range(width - room_width)
+        for y in range(height - room_height)
+        if not any(
+            RectangularRoom(x, y, room_width, room_height).intersects(room) for room in rooms
+        )
+    ]
+
+@pytest.mark.parametrize("seed", range(20))
+def test_is_free_matches_intersects(seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(20, 60), rng.randint(20, 60)
+    placer = RoomPlacer(width, height)
+    # Rebuild rarely, so that stale tables are exercised too.
+    placer.rebuild_after = rng.choice([1, 3, 1000])
+    rooms = []
+    for _ in range(200):
+        room_width, room_height = rng.randint(2, 8), rng.randint(2, 8)
+        room = RectangularRoom(
+            rng.randint(0, width - room_width - 1),
+            rng.randint(0, height - room_height - 1),
+            room_width,
+            room_height,
+        )
+        expected = not any(room.intersects(other) for other in rooms)
+        assert placer.is_free(room) == expected
+        if expected:
+            placer.add(room)
+            rooms.append(room)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fitting_positions_match_brute_force(seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(15, 40), rng.randint(15, 40)
+    placer = RoomPlacer(width, height)
+    rooms = []
+    sizes = [(rng.randint(2, 6), rng.randint(2, 6)) for _ in range(3)]
+    for _ in range(30):
+        room_width, room_height = rng.choice(sizes)
+        expected = fitting_positions(rooms, width, height, room_width, room_height)
+        fits, counts = placer.fits.get((room_width + 1, room_height + 1), (None, None))
+        if fits is not None:
+            assert list(zip(*np.nonzero(fits))) == expected
+            assert counts.tolist() == fits.sum(axis=1).tolist()
+
+        draw_rng = random.Random(seed)
+        position = placer.random_fitting_position(room_width, room_height, draw_rng)
+        if not expected:
+            assert position is None
+            continue
+        # The position drawn is the one at the same rank among all fitting positions.
+        assert position == expected[random.Random(seed).randrange(len(expected))]
+        room = RectangularRoom(*position, room_width, room_height)
+        assert placer.is_free(room)
+        placer.add(room)
+        rooms.append(room)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from status_effects import EXTEND, REFRESH, STACK, EffectType, StatusEffects, TimerWheel
+
+class Target:
+    """
+    Stands in for an actor, only `effects` is used.
+    """
+    def __init__(self) -> None:
+        self.effects = {}
+
+@pytest.mark.parametrize("seed", range(20))
+def test_timer_wheel_matches_due_times(seed):
+    rng = random.Random(seed)
+    # Small wheels, so that cascading between levels and the overflow are exercised.
+    wheel = TimerWheel(slot_bits=2, levels=3, now=rng.randint(0, 100))
+    due = {}
+    next_item = 0
+    while wheel.now < 2_000:
+        for _ in range(rng.randint(0, 5)):
+            at = wheel.now + rng.choice([-3, 0, 1, 2, 5, 17, 70, 300, 1_000])
+            wheel.schedule(next_item, at)
+            due[next_item] = max(at, wheel.now + 1)
+            next_item += 1
+        to = wheel.now + rng.choice([1, 1, 1, 4, 30])
+        fired = wheel.advance(to)
+        expected = {item for item, at in due.items() if at <= to}
+        assert set(fired) == expected
+        assert len(fired) == len(expected)
+        assert [due[item] for item in fired] == sorted(due[item] for item in fired)
+        for item in fired:
+            del due[item]
+        assert len(wheel) == len(due)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_status_effects_match_countdown(seed):
+    rng = random.Random(seed)
+    types = [
+        EffectType("refresh", REFRESH),
+        EffectType("stack", STACK, max_stacks=3),
+        EffectType("extend", EXTEND),
+    ]
+    targets = [Target() for _ in range(5)]
+    manager = StatusEffects()
+    # Turns remaining on each (target, type name), counted down every turn.
+    remaining = {}
+    for turn in range(300):
+        for _ in range(rng.randint(0, 3)):
+            target, effect_type = rng.choice(targets), rng.choice(types)
+            key = (id(target), effect_type.name)
+            if rng.random() < 0.2:
+                manager.remove(target, effect_type)
+                remaining.pop(key, None)
+                continue
+            duration = rng.randint(1, 40)
+            manager.apply(target, effect_type, duration, turn)
+            if key not in remaining:
+                remaining[key] = duration + 1
+            elif effect_type.stacking == EXTEND:
+                remaining[key] += duration
+            else:
+                remaining[key] = max(remaining[key], duration + 1)
+
+        expired = manager.advance(turn + 1)
+        for key in remaining:
+            remaining[key] -= 1
+        expected = {key for key, turns in remaining.items() if turns <= 0}
+        assert {(id(effect.target), effect.type.name) for effect in expired} == expected
+        for key in expected:
+            del remaining[key]
+        assert manager.active_count == len(remaining)
+        assert {
+            (id(target), name) for target in targets for name in target.effects
+        } == set(remaining)
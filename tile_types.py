@@ -45,4 +45,31 @@ wall = new_tile(
     transparent=False, 
     dark=(ord("#"), (100, 100, 100), (0, 0, 0)),
     light=(ord("#"), (200, 200, 200), (0, 0, 0)),
-)
\ No newline at end of file
+)
+
+down_stairs = new_tile(
+    walkable=True,
+    transparent=True,
+    dark=(ord(">"), (0, 0, 100), (50, 50, 150)),
+    light=(ord(">"), (255, 255, 255), (200, 180, 50)),
+)
+
+# Every tile type, so that a map can be stored as one byte per tile, see `encode`.
+palette = np.array([wall, floor, down_stairs], dtype=tile_dt)
+# The index of each tile type in palette.
+WALL, FLOOR, DOWN_STAIRS = range(len(palette))
+
+def encode(tiles: np.ndarray) -> np.ndarray:
+    """
+    Return the index in `palette` of each tile, tiles not in the palette become walls.
+    """
+    codes = np.zeros(tiles.shape, dtype=np.uint8, order="F")
+    for index in range(1, len(palette)):
+        codes[tiles == palette[index]] = index
+    return codes
+
+def decode(codes: np.ndarray) -> np.ndarray:
+    """
+    Return the tiles for an array of `palette` indices, the inverse of `encode`.
+    """
+    return np.asfortranarray(palette[codes])
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import multiprocessing
+from multiprocessing.pool import AsyncResult, Pool
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from components.ai import Pack
+from engine import Engine
+import entity_factories
+from game_map import GameMap
+from procgen import ROOMS, carve_layout, choose_spawns
+from rng import RNGStreams, derive_seed
+import tile_types
+
+if TYPE_CHECKING:
+    from map_cache import MapCache
+
+class FloorParameters(NamedTuple):
+    """
+    The arguments `generate_dungeon` is called with for a floor.
+    """
+    max_rooms: int = 30
+    room_min_size: int = 6
+    room_max_size: int = 10
+    map_width: int = 80
+    map_height: int = 45
+    max_monsters_per_room: int = 2
+    max_items_per_room: int = 2
+    packs: bool = False
+    generator: str = ROOMS
+
+# (first depth, value) pairs, the value applies from that depth until the next pair's.
+MAX_MONSTERS_BY_DEPTH = [(1, 2), (4, 3), (6, 5)]
+MAX_ITEMS_BY_DEPTH = [(1, 2), (4, 3)]
+# Monsters hunt in packs from this depth on.
+PACKS_FROM_DEPTH = 4
+
+def value_for_depth(table: Sequence[Tuple[int, int]], depth: int) -> int:
+    """
+    Return the value in a (first depth, value) table which applies at depth.
+    """
+    value = 0
+    for first_depth, table_value in table:
+        if first_depth > depth:
+            break
+        value = table_value
+    return value
+
+def floor_parameters(depth: int) -> FloorParameters:
+    """
+    Return the parameters of the default dungeon at depth, starting from 1.
+    """
+    return FloorParameters(
+        max_monsters_per_room=value_for_depth(MAX_MONSTERS_BY_DEPTH, depth),
+        max_items_per_room=value_for_depth(MAX_ITEMS_BY_DEPTH, depth),
+        packs=depth >= PACKS_FROM_DEPTH,
+    )
+
+class Floor(NamedTuple):
+    """
+    A generated floor in compact form, cheap to send between processes.
+
+    tiles        -- the `tile_types.palette` index of each tile, one byte per tile.
+    player_start -- where the player arrives.
+    downstairs   -- where the stairs to the next floor are.
+    spawns       -- the `entity_factories.spawnable` name and position of each entity.
+    packs        -- the indices in spawns of the members of each `components.ai.Pack`.
+    """
+    depth: int
+    seed: int
+    tiles: np.ndarray
+    player_start: Tuple[int, int]
+    downstairs: Tuple[int, int]
+    spawns: List[Tuple[str, int, int]]
+    packs: List[List[int]]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns the approximate size of this floor, mostly the tiles.
+        """
+        return self.tiles.nbytes + 16 * len(self.spawns)
+
+def unpack_floor(floor: Floor, engine: Engine) -> GameMap:
+    """
+    Build the map for a floor, spawning its entities and moving the engine's player onto it.
+    """
+    width, height = floor.tiles.shape
+    game_map = GameMap(engine, width, height)
+    game_map.tiles = tile_types.decode(floor.tiles)
+    game_map.downstairs_location = floor.downstairs
+    engine.player.place(*floor.player_start, game_map)
+    spawnable = entity_factories.spawnable
+    spawned = [spawnable[name].spawn(game_map, x, y) for name, x, y in floor.spawns]
+    for members in floor.packs:
+        Pack([spawned[i] for i in members])
+    return game_map
+
+def generate_floor(depth: int, seed: int, parameters: FloorParameters) -> Floor:
+    """
+    Generate the floor at depth from its seed.
+
+    This runs headless: the layout is carved straight into palette indices and the spawns
+    are only chosen, no engine, map or entity is built. It draws from the same streams as
+    `generate_dungeon` on an engine with this seed, so it makes the same floor.
+
+    This is what worker processes run. The same arguments always give the same floor,
+    whichever process generates it.
+    """
+    streams = RNGStreams(seed)
+    tiles = np.full(
+        (parameters.map_width, parameters.map_height),
+        fill_value=tile_types.WALL,
+        dtype=np.uint8,
+        order="F",
+    )
+    rooms = carve_layout(
+        tiles,
+        parameters.max_rooms,
+        parameters.room_min_size,
+        parameters.room_max_size,
+        streams.map_generation,
+        generator=parameters.generator,
+        floor=tile_types.FLOOR,
+    )
+    walkable = tile_types.palette["walkable"][tiles]
+    occupied = np.zeros(tiles.shape, dtype=bool)
+    player_start = downstairs = (0, 0)
+    if rooms:
+        player_start = rooms[0].center
+        occupied[player_start] = True
+    spawns: List[Tuple[str, int, int]] = []
+    packs: List[List[int]] = []
+    for room in rooms:
+        monsters, items = choose_spawns(
+            room,
+            walkable,
+            occupied,
+            parameters.max_monsters_per_room,
+            parameters.max_items_per_room,
+            streams.spawns,
+        )
+        if parameters.packs and len(monsters) > 1:
+            packs.append(list(range(len(spawns), len(spawns) + len(monsters))))
+        spawns += monsters
+        spawns += items
+    if rooms:
+        downstairs = rooms[-1].center
+        tiles[downstairs] = tile_types.DOWN_STAIRS
+
+    # List the spawns by position, no two share one, and the packs by their first member.
+    order = sorted(range(len(spawns)), key=lambda i: spawns[i][1:])
+    position = {old: new for new, old in enumerate(order)}
+    return Floor(
+        depth=depth,
+        seed=seed,
+        tiles=tiles,
+        player_start=player_start,
+        downstairs=downstairs,
+        spawns=[spawns[i] for i in order],
+        packs=sorted(([position[i] for i in members] for members in packs), key=min),
+    )
+
+class GameWorld:
+    """
+    The floors of the dungeon, the player is on `current_floor`, starting from 1.
+
+    Once the player is on a floor the next one is generated in a worker process, so that
+    descending only has to install it. Each floor's seed is derived from the engine's seed
+    and the depth, so whether a floor was generated ahead of time makes no difference.
+
+    Floors are also loaded from and stored in cache if one is given, so replaying a seed
+    doesn't generate anything.
+    """
+    def __init__(
+            self,
+            engine: Engine,
+            parameters: Callable[[int], FloorParameters] = floor_parameters,
+            background: bool = True,
+            cache: Optional[MapCache] = None,
+    ) -> None:
+        self.engine = engine
+        self.parameters = parameters
+        self.cache = cache
+        self.current_floor = 0
+        # Generate the next floor ahead of time in a worker process.
+        self.background = background
+        self._pool: Optional[Pool] = None
+        self._next: Optional[AsyncResult] = None
+        self._next_depth = 0
+        # Seconds the last descent spent generating or waiting for its floor.
+        self.wait_seconds = 0.0
+
+    def seed_for(self, depth: int) -> int:
+        return derive_seed(self.engine.rng.seed, f"floor {depth}")
+
+    def generate_floor(self) -> None:
+        """
+        Move the player down to the next floor.
+        """
+        depth = self.current_floor + 1
+        start_time = time.perf_counter()
+        floor = self.take(depth)
+        self.wait_seconds = time.perf_counter() - start_time
+        self.current_floor = depth
+        self.install(floor)
+        if self.background:
+            self.prefetch(depth + 1)
+
+    def take(self, depth: int) -> Floor:
+        """
+        Return the floor at depth, waiting for the worker if it is generating it, or
+        generating it here if not.
+        """
+        seed, parameters = self.seed_for(depth), self.parameters(depth)
+        result, self._next = self._next, None
+        if result is not None and self._next_depth == depth:
+            floor = result.get()
+            if self.cache is not None:
+                self.cache.put(floor, parameters)
+            return floor
+        if self.cache is not None:
+            return self.cache.load_or_generate(depth, seed, parameters)
+        return generate_floor(depth, seed, parameters)
+
+    def prefetch(self, depth: int) -> None:
+        """
+        Start generating the floor at depth in the worker process, unless it is cached.
+        """
+        seed, parameters = self.seed_for(depth), self.parameters(depth)
+        if self.cache is not None and self.cache.has(seed, parameters):
+            return
+        if self._pool is None:
+            # Spawn rather than fork, the worker doesn't need a copy of the game's window.
+            self._pool = multiprocessing.get_context("spawn").Pool(processes=1)
+        self._next = self._pool.apply_async(generate_floor, (depth, seed, parameters))
+        self._next_depth = depth
+
+    def install(self, floor: Floor) -> None:
+        engine = self.engine
+        old_map: Optional[GameMap] = getattr(engine, "_game_map", None)
+        if old_map is not None:
+            # Drop effects on the monsters left behind, so they don't expire with a message.
+            for actor in old_map.actors:
+                if actor is not engine.player:
+                    engine.status_effects.clear(actor)
+        engine.game_map = unpack_floor(floor, engine)
+        engine.game_map.build_pathfinding()
+        engine.update_fov()
+
+    def close(self) -> None:
+        """
+        Stop the worker process, if there is one, without waiting for the floor it may be
+        generating.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._next = None